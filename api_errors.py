@@ -0,0 +1,129 @@
+import random
+import threading
+
+DEFAULT_MAX_ATTEMPTS = 4        # tries per API call, including the first
+DEFAULT_RETRY_BUDGET = 50       # retries allowed per run, over all calls and workers
+DEFAULT_BASE_DELAY = 1.0        # seconds; doubled after every failed try
+MAX_DELAY = 32.0                # seconds
+
+QUOTA_REASONS = {'quotaExceeded', 'dailyLimitExceeded'}
+RATE_LIMIT_REASONS = {'rateLimitExceeded', 'userRateLimitExceeded', 'http_429'}
+KEY_REASONS = {'keyInvalid', 'keyExpired', 'accessNotConfigured', 'forbidden'}
+TRANSIENT_REASONS = {'backendError', 'internalError', 'http_500', 'http_502', 'http_503', 'http_504',
+                     'network_error'}
+
+
+class YouTubeAPIError(Exception):
+    """An API call that failed with an error response (or kept failing after retries)"""
+
+    transient = False   # worth retrying the same call
+
+    def __init__(self, status, reason, message=''):
+        self.status = status
+        self.reason = reason
+        self.message = message
+        super().__init__(f"YouTube API error {status} {reason}: {message}".rstrip(': '))
+
+
+class TransientAPIError(YouTubeAPIError):
+    """Temporary server-side failure (backendError, 5xx, connection reset)"""
+    transient = True
+
+
+class RateLimitError(TransientAPIError):
+    """Too many requests (rateLimitExceeded, userRateLimitExceeded, 429)"""
+
+
+class QuotaExceededError(YouTubeAPIError):
+    """The key is out of quota for today (quotaExceeded, dailyLimitExceeded)"""
+
+
+class KeyInvalidError(YouTubeAPIError):
+    """The API key is invalid, expired or not allowed to use the API"""
+
+
+# errors after which no further call can succeed; searches stop instead of moving on
+FATAL_ERRORS = (QuotaExceededError, KeyInvalidError)
+
+
+def api_error(status, reason, message=''):
+    """Build the typed exception for an error response with <status> and API error <reason>"""
+    if reason in QUOTA_REASONS:
+        error_class = QuotaExceededError
+    elif reason in RATE_LIMIT_REASONS:
+        error_class = RateLimitError
+    elif reason in KEY_REASONS:
+        error_class = KeyInvalidError
+    elif reason in TRANSIENT_REASONS or (status and status >= 500):
+        error_class = TransientAPIError
+    else:
+        error_class = YouTubeAPIError
+    return error_class(status, reason, message)
+
+
+def error_message(data):
+    """The 'message' of an API error body, or ''"""
+    try:
+        return data['error']['message']
+    except (KeyError, TypeError):
+        return ''
+
+
+class RetryPolicy:
+    """
+    Jittered exponential backoff with a retry budget.
+
+    A transient failure is retried up to max_attempts tries per call, waiting a
+    random time up to base_delay * 2^retry (capped at MAX_DELAY, or the server's
+    Retry-After when longer). The budget caps retries over the whole run and is
+    shared by every worker, so a failing API is not hammered by all of them.
+    """
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, budget=DEFAULT_RETRY_BUDGET,
+                 base_delay=DEFAULT_BASE_DELAY):
+        self.max_attempts = max(1, max_attempts)
+        self.budget = budget
+        self.base_delay = base_delay
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create the policy described by the retry_* settings"""
+        def number(name, default, cast):
+            try:
+                return cast(settings.get(name, '') or default)
+            except (ValueError, TypeError):
+                return default
+        return cls(number('retry_max_attempts', DEFAULT_MAX_ATTEMPTS, int),
+                   number('retry_budget', DEFAULT_RETRY_BUDGET, int),
+                   number('retry_base_delay', DEFAULT_BASE_DELAY, float))
+
+    def reset(self):
+        """Start a new run with the full retry budget"""
+        with self._lock:
+            self.retries = 0
+
+    def next_delay(self, attempt, retry_after=None):
+        """
+        Seconds to wait before retrying a call that failed on try <attempt> (1-based),
+        or None when it may not be retried (attempts or budget used up).
+        """
+        if attempt >= self.max_attempts:
+            return None
+        with self._lock:
+            if self.retries >= self.budget:
+                return None
+            self.retries += 1
+        delay = random.uniform(0, min(MAX_DELAY, self.base_delay * 2 ** (attempt - 1)))
+        if retry_after:
+            delay = max(delay, min(MAX_DELAY, retry_after))
+        return delay
+
+
+def retry_after_seconds(headers):
+    """Retry-After header value in seconds, or None"""
+    try:
+        return float(headers.get('Retry-After'))
+    except (TypeError, ValueError):
+        return None
@@ -11,7 +11,27 @@ def get_api_key():
             return data.get("YOUTUBE_API_KEY", "")
     return ""
 
+def get_api_keys():
+    """
+    Load every API key from file: YOUTUBE_API_KEY first, then the optional
+    YOUTUBE_API_KEYS list used as a key pool. Duplicates and blanks are dropped.
+    """
+    if not os.path.exists(API_KEY_FILE):
+        return []
+    with open(API_KEY_FILE, "r") as f:
+        data = json.load(f)
+    keys = [data.get("YOUTUBE_API_KEY", "")] + list(data.get("YOUTUBE_API_KEYS", []))
+    return list(dict.fromkeys(key.strip() for key in keys if key and key.strip()))
+
 def set_api_key(api_key):
-    """Save the API key to file."""
+    """Save the (primary) API key to file, keeping any YOUTUBE_API_KEYS pool."""
+    data = {}
+    if os.path.exists(API_KEY_FILE):
+        try:
+            with open(API_KEY_FILE, "r") as f:
+                data = json.load(f)
+        except ValueError:
+            data = {}
+    data["YOUTUBE_API_KEY"] = api_key.strip()
     with open(API_KEY_FILE, "w") as f:
-        json.dump({"YOUTUBE_API_KEY": api_key.strip()}, f)
\ No newline at end of file
+        json.dump(data, f)
@@ -1,44 +1,80 @@
 import argparse
+import asyncio
 import json
 import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import pandas as pd
-from youtube_api import YouTubeSearcher
+from youtube_api import YouTubeSearcher, setting_int
+from youtube_api_async import AsyncYouTubeSearcher
 from csv_handler import CSVHandler
-from utils import parse_duration_minutes, validate_api_key, passes_timeframe_view_filter, quota_warning_threshold, passes_upload_date_filter
+from enrichment import BatchEnricher
+from api_errors import FATAL_ERRORS
+from quota_manager import QuotaBudget, KeyPool, mask_key
+from quota_estimator import QuotaEstimator, estimate_quota
+from result_sink import ResultSink, DEFAULT_FLUSH_SIZE
+from checkpoint import Checkpoint
+from page_scheduler import PageScheduler, DEFAULT_MIN_KEEP_RATE
+from query_planner import plan_search_params, describe_plan
+from filters import FilterPipeline, REJECTION_STAGES, new_keyword_stats, format_rejections
+from utils import validate_api_key, quota_warning_threshold
 from datetime import datetime, timedelta        # NEW: timedelta for auto-clear
 
-# NEW: Import get_api_key from api_key_manager
-from api_key_manager import get_api_key
+# NEW: Import get_api_keys from api_key_manager
+from api_key_manager import get_api_keys
 
 class HeadlessYouTubeSearcher:
-    def __init__(self, settings_file):
+    def __init__(self, settings_file, resume=False, refilter=False):
         # Load settings
         with open(settings_file, 'r') as f:
             self.settings = json.load(f)
+        # re-filter cached search results without calling the API (ignores and keeps seen-history)
+        self.refilter = refilter or bool(self.settings.get('refilter_from_cache', False))
+        self.resume = resume and not self.refilter  # continue from data/checkpoint.json instead of starting over
         
         # Initialize components
-        self.csv_handler = CSVHandler()
+        self.csv_handler = CSVHandler(self.settings.get('storage_backend', 'csv'),
+                                      self.settings.get('output_format', 'csv'))
         
         # Initialize API
-        api_key = os.getenv('YOUTUBE_API_KEY', '')
-        if not api_key:
-            # Try apikey.json
-            api_key = get_api_key()
-        if not api_key:
+        # YOUTUBE_API_KEY may hold several comma-separated keys
+        api_keys = [k.strip() for k in os.getenv('YOUTUBE_API_KEY', '').split(',') if k.strip()]
+        if not api_keys:
+            # Try apikey.json (YOUTUBE_API_KEY plus the optional YOUTUBE_API_KEYS pool)
+            api_keys = get_api_keys()
+        if not api_keys:
             print('ERROR: YouTube API Key not found! Please set YOUTUBE_API_KEY environment variable or create apikey.json.')
             sys.exit(1)
-        
-        if not validate_api_key(api_key):
+
+        for key in api_keys:
+            if not validate_api_key(key):
+                print(f'Warning: Skipping API key with invalid format: {mask_key(key)}')
+        api_keys = [key for key in api_keys if validate_api_key(key)]
+        if not api_keys:
             print('ERROR: Invalid YouTube API Key format!')
             sys.exit(1)
-            
-        self.youtube_searcher = YouTubeSearcher(api_key)
+        if len(api_keys) > 1:
+            print(f'Using a pool of {len(api_keys)} API keys')
+
+        self.api_key = api_keys[0]
+        self.youtube_searcher = YouTubeSearcher.from_settings(self.api_key, self.settings)
+        self.key_pool = KeyPool.from_settings(api_keys, self.settings)  # per-key daily quota, shared with other runs
+        self.youtube_searcher.key_pool = self.key_pool
+        if self.refilter:
+            self.youtube_searcher.cache_only = True
+        else:
+            self.youtube_searcher.seen_filter = self.csv_handler.is_video_seen  # skip seen videos before enrichment
+        self.active_searcher = self.youtube_searcher  # the engine whose HTTP stats get reported
         
         # Initialize state
         self.quota_used = 0
         self.search_stats = {'scanned': 0, 'kept': 0, 'skipped': 0}
+        self.keyword_stats = {}  # keyword -> funnel counters (pages, quota, rejections per stage, kept)
+        self.page_scheduler = None  # PageScheduler when adaptive_pages is enabled
+        self.pages_per_keyword = 0  # pages requested per keyword, set by run_search
+        self._lock = threading.Lock()
         
         # Create directories
         os.makedirs('data', exist_ok=True)
@@ -49,6 +85,7 @@ class HeadlessYouTubeSearcher:
         """Execute the headless search"""
         start_time = datetime.now()
         print(f"Starting YouTube search at {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+        self.youtube_searcher.retry_policy.reset()  # the retry budget is per run
 
         try:
             # Parse keywords
@@ -62,122 +99,115 @@ class HeadlessYouTubeSearcher:
 
             # Get search parameters
             pages_per_keyword = int(self.settings.get('pages', 2))
+            self.pages_per_keyword = pages_per_keyword
             api_cap = int(self.settings.get('api_cap', 9500))
 
-            # timeframe-view filter parameters
-            days_back = self.settings.get('days_back', '').strip()
-            min_daily_views = self.settings.get('min_daily_views', '').strip()
-
-            # upload-date range parameters
-            upload_date_min = self.settings.get('upload_date_min', '').strip()
-            upload_date_max = self.settings.get('upload_date_max', '').strip()
-
-            # Build RFC-3339 timestamps for YouTube API
-            def _to_rfc(dt_str):
-                return f"{dt_str}T00:00:00Z" if dt_str else ''
-            published_after  = _to_rfc(upload_date_min)
-            published_before = _to_rfc(upload_date_max)
-
             # history retention auto-clear
             keep_days_str = self.settings.get('history_keep_days', '').strip()
-            if keep_days_str.isdigit():
+            if keep_days_str.isdigit() and not self.refilter:
                 keep_days = int(keep_days_str)
                 self.csv_handler.clear_history_older_than(keep_days)
 
-            # Clear history if fresh search (manual override)
-            if self.settings.get('fresh_search', False):
+            # Resume an interrupted run from its checkpoint, or start a new one
+            if self.refilter:
+                print("Re-filtering cached search results: no API calls, seen-history ignored and not updated")
+                self.checkpoint = Checkpoint(checkpoint_file=None)  # leaves a real run's checkpoint alone
+            elif self.resume:
+                self.checkpoint = Checkpoint.load()
+                remaining = [k for k in keywords if not self.checkpoint.is_completed(k)]
+                print(f"Resuming: {len(keywords) - len(remaining)} of {len(keywords)} keywords already done")
+                keywords = remaining
+                if self.checkpoint.run_date == start_time.strftime('%Y-%m-%d'):
+                    self.quota_used = self.checkpoint.quota_used  # same quota day: count what was spent
+                if not keywords:
+                    self.checkpoint.clear()
+                    print("Nothing left to resume")
+                    return True
+            else:
+                self.checkpoint = Checkpoint()
+
+            # The daily quota is shared with every other run today (it resets at midnight Pacific time)
+            remaining_today = self.key_pool.remaining_today()
+            print(f"Quota today: {self.key_pool.used_today()} used, "
+                  f"{'unlimited' if remaining_today is None else remaining_today} remaining")
+            if remaining_today is not None and self.quota_used + remaining_today < api_cap and not self.refilter:
+                api_cap = self.quota_used + remaining_today
+                print(f"API cap lowered to {api_cap} to stay within the daily quota")
+
+            # Quota estimate calibrated from past runs
+            if not self.refilter:
+                estimate = estimate_quota(keywords, pages_per_keyword, QuotaEstimator.from_logs(self.csv_handler))
+                print(f"Estimated quota: {estimate['total_quota']} "
+                      f"(90 % range {estimate['low']}-{estimate['high']}, "
+                      f"calibrated on {estimate['calibrated_runs']} past runs)")
+                if estimate['high'] > api_cap - self.quota_used:
+                    print(f"Warning: the run may stop early, up to {estimate['high']} units could be needed "
+                          f"but only {api_cap - self.quota_used} are available")
+
+            # Clear history if fresh search (manual override); a resumed run keeps what it already saw
+            if self.settings.get('fresh_search', False) and not self.resume and not self.refilter:
                 print("Fresh search enabled - clearing history")
                 self.csv_handler.clear_history()
 
-            # Initialize results
-            all_results = []
-
-            for i, keyword in enumerate(keywords, 1):
-                print(f"\nProcessing keyword {i}/{len(keywords)}: '{keyword}'")
-
-                try:
-                    # Search videos for this keyword with upload-date range
-                    videos = self.youtube_searcher.search_videos(
-                        query=keyword,
-                        max_pages=pages_per_keyword,
-                        region=self.settings.get('region', ''),
-                        language=self.settings.get('language', ''),
-                        duration_filter=self.settings.get('duration', 'Any'),
-                        quota_limit=api_cap - self.quota_used,
-                        published_after=published_after,
-                        published_before=published_before
-                    )
-
-                    self.quota_used += self.youtube_searcher.quota_used
-                    print(f"  Found {len(videos)} videos, quota used so far: {self.quota_used}")
-
-                    # Apply filters and deduplication
-                    keyword_results = []
-                    for video in videos:
-                        self.search_stats['scanned'] += 1
-
-                        # Check if already seen
-                        if self.csv_handler.is_video_seen(video['video_id']):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Apply duration filter
-                        duration_minutes = parse_duration_minutes(video.get('duration', ''))
-                        if not self.passes_duration_filter(duration_minutes):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Apply view filter
-                        view_count = int(video.get('view_count', 0))
-                        if not self.passes_view_filter(view_count):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # timeframe view filter
-                        if not passes_timeframe_view_filter(
-                                view_count,
-                                video.get('published_at', ''),
-                                days_back,
-                                min_daily_views):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # upload-date range filter (post-fetch sanity check)
-                        if not passes_upload_date_filter(
-                                video.get('published_at', ''),
-                                upload_date_min,
-                                upload_date_max):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Apply subscriber filter
-                        subscriber_count = int(video.get('subscriber_count', 0))
-                        if self.settings.get('skip_hidden', True) and video.get('hidden_subscriber_count', False):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        if not self.passes_subscriber_filter(subscriber_count):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Add keyword and duration to video data
-                        video['keyword'] = keyword
-                        video['duration_minutes'] = duration_minutes
-                        keyword_results.append(video)
-                        self.search_stats['kept'] += 1
-
-                    all_results.extend(keyword_results)
-                    print(f"  Kept {len(keyword_results)} videos after filtering")
-
-                    # Check quota limit
-                    warning_limit = quota_warning_threshold(api_cap)
-                    if warning_limit and self.quota_used >= warning_limit:
-                        print(f"⚠️  90 % quota reached ({self.quota_used}/{api_cap}) – stopping.")
-                        break
-
-                except Exception as e:
-                    print(f"  ERROR searching '{keyword}': {str(e)}")
-                    continue
+            # Push as many filters as possible into the search.list parameters
+            search_params = plan_search_params(self.settings, pages_per_keyword)
+            print(f"Query plan: {describe_plan(search_params)}")
+
+            # Adaptive pagination: stop unproductive keywords early, give their pages to productive ones.
+            # Only the serial and concurrent engines ask the scheduler after each page.
+            per_page_engine = (self.settings.get('search_engine', 'sync') != 'async'
+                               and not self.settings.get('batch_enrichment', False))
+            if self.settings.get('adaptive_pages', False) and not per_page_engine:
+                print("Adaptive paging is not used by the batched and async engines, ignoring it")
+            elif self.settings.get('adaptive_pages', False):
+                self.page_scheduler = PageScheduler(
+                    pages_per_keyword,
+                    max_pages=int(self.settings.get('adaptive_max_pages', '') or 0) or None,
+                    min_keep_rate=float(self.settings.get('adaptive_min_keep_rate', '')
+                                        or DEFAULT_MIN_KEEP_RATE),
+                    history=self.csv_handler.get_keyword_history())
+                search_params['max_pages'] = self.page_scheduler.max_pages
+                print(f"Adaptive paging: {pages_per_keyword} pages per keyword, "
+                      f"up to {self.page_scheduler.max_pages} for productive keywords")
+
+            # Post-fetch filters, compiled once for the whole run
+            pipeline = FilterPipeline.from_settings(self.settings)
+
+            # Kept videos are streamed to the results file and history as they are found
+            today = datetime.now().strftime('%Y-%m-%d')
+            results_file = f'export/results_{today}.csv'
+            if self.refilter:
+                # a separate file per re-filter run, so tuning does not pile up in the daily results
+                results_file = f"export/refilter_{start_time.strftime('%Y-%m-%d_%H%M%S')}.csv"
+            sink = ResultSink(self.csv_handler, results_file,
+                              flush_size=max(1, setting_int(self.settings, 'result_flush_size', DEFAULT_FLUSH_SIZE)),
+                              dedupe=self.settings.get('dedupe_results', False),
+                              record_history=not self.refilter)
+
+            workers = self._get_worker_count()
+            with sink:
+                if self.quota_used >= api_cap:
+                    # resumed run that already spent its cap; a zero budget would mean unlimited
+                    print(f"API cap of {api_cap} already used – nothing left to search")
+                elif self.settings.get('search_engine', 'sync') == 'async':
+                    print("Using async search engine")
+                    asyncio.run(self._run_async(keywords, search_params, pipeline, api_cap, sink))
+                elif self.settings.get('batch_enrichment', False):
+                    print("Batching video/channel enrichment across keywords")
+                    self._run_batched(keywords, search_params, pipeline, api_cap, workers, sink)
+                elif workers > 1:
+                    print(f"Running {workers} concurrent workers")
+                    self._run_concurrent(keywords, search_params, pipeline, api_cap, workers, sink)
+                else:
+                    self._run_serial(keywords, search_params, pipeline, api_cap, sink)
+            if not self.refilter:
+                self.key_pool.record_run()
+
+            if all(self.checkpoint.is_completed(k) for k in keywords):
+                self.checkpoint.clear()
+            elif not self.refilter:
+                self.checkpoint.save(self.quota_used)
+                print("Run did not finish; continue it later with --resume")
 
             # Save results
             end_time = datetime.now()
@@ -185,20 +215,44 @@ class HeadlessYouTubeSearcher:
 
             print(f"\nSearch completed in {duration}")
             print(f"Stats: Scanned {self.search_stats['scanned']}, Kept {self.search_stats['kept']}, Skipped {self.search_stats['skipped']}")
+            rejected = {stage: sum(stats[stage] for stats in self.keyword_stats.values())
+                        for stage in REJECTION_STAGES}
+            print(f"Rejected by stage: {format_rejections(rejected)}")
+            if not self.refilter:  # cached pages would skew the quota and keep-rate history
+                self.csv_handler.log_keyword_stats(start_time.strftime('%Y-%m-%d %H:%M:%S'),
+                                                   {k: self.keyword_stats[k] for k in keywords
+                                                    if k in self.keyword_stats})
             print(f"Total quota used: {self.quota_used}")
-
-            if all_results:
-                results_df = pd.DataFrame(all_results)
-                today = datetime.now().strftime('%Y-%m-%d')
-                results_file = f'export/results_{today}.csv'
-
-                self.csv_handler.save_results(results_df, results_file)
-                self.csv_handler.update_history([r['video_id'] for r in all_results])
-
-                print(f"Saved {len(all_results)} results to: {results_file}")
+            for endpoint, stats in self.key_pool.endpoint_stats().items():
+                outcomes = ', '.join(f"{outcome} {count}" for outcome, count in stats['outcomes'].items())
+                print(f"  Today {endpoint}.list: {stats['calls']} calls, {stats['units']} units ({outcomes})")
+            if self.page_scheduler is not None:
+                print(f"Adaptive paging saved {self.page_scheduler.pages_saved} search pages "
+                      f"({self.page_scheduler.pages_saved * 100} quota units)")
+            channel_cache = self.youtube_searcher.channel_cache
+            if channel_cache is not None:
+                channel_cache.save()
+                print(f"Channel cache: {channel_cache.hits} hits, {channel_cache.misses} misses")
+            for name, cache in (('Search', self.youtube_searcher.search_cache),
+                                ('Response', self.youtube_searcher.response_cache)):
+                if cache is not None:
+                    cache.save()
+                    print(f"{name} cache: {cache.hits} hits, {cache.revalidated} "
+                          f"not modified, {cache.misses} fetched")
+            limiter = self.youtube_searcher.rate_limiter
+            if limiter.waits:
+                print(f"Rate limiter: {limiter.waits} calls waited {limiter.waited:.1f}s in total")
+            conn_stats = self.active_searcher.get_connection_stats()
+            print(f"HTTP: {conn_stats['requests']} requests, "
+                  f"{conn_stats['connections_opened']} connections opened, "
+                  f"{conn_stats['connections_reused']} reused")
+
+            if sink.count:
+                print(f"Saved {sink.count} results to: {results_file}")
 
                 # Log the run
-                self.log_run(start_time, self.quota_used, len(keywords), len(all_results))
+                if not self.refilter:
+                    self.log_run(start_time, self.quota_used, len(keywords), sink.count)
 
                 return True
             else:
@@ -208,55 +262,338 @@ class HeadlessYouTubeSearcher:
         except Exception as e:
             print(f"FATAL ERROR: {str(e)}")
             return False
+        finally:
+            self.key_pool.flush()
     
-    def passes_view_filter(self, view_count):
-        """Check if video passes view count filter"""
-        views_min = self.settings.get('views_min', '')
-        views_max = self.settings.get('views_max', '')
-        
-        if views_min and view_count < int(views_min):
-            return False
-        if views_max and view_count > int(views_max):
-            return False
-        return True
-    
-    def passes_subscriber_filter(self, subscriber_count):
-        """Check if video passes subscriber count filter"""
-        subs_min = self.settings.get('subs_min', '')
-        subs_max = self.settings.get('subs_max', '')
-        
-        if subs_min and subscriber_count < int(subs_min):
-            return False
-        if subs_max and subscriber_count > int(subs_max):
-            return False
-        return True
-    
-    def log_run(self, start_time, quota_used, keywords_count, results_count):
-        """Log the run details"""
+    def _get_worker_count(self):
+        """Number of keywords searched in parallel (settings 'concurrent_workers', 1 = serial)"""
         try:
-            log_file = 'logs/runs.csv'
-            log_data = {
-                'run_timestamp': start_time.strftime('%Y-%m-%d %H:%M:%S'),
-                'estimated_quota_used': quota_used,
-                'keywords_count': keywords_count,
-                'results_count': results_count
-            }
-            
-            # Create or append to log file
-            if os.path.exists(log_file):
-                log_df = pd.read_csv(log_file)
-                log_df = pd.concat([log_df, pd.DataFrame([log_data])], ignore_index=True)
+            return max(1, int(self.settings.get('concurrent_workers', 1) or 1))
+        except (ValueError, TypeError):
+            return 1
+
+    def _run_serial(self, keywords, search_params, pipeline, api_cap, sink):
+        """
+        Search keywords one after another.
+        Each page is filtered and saved as soon as it arrives and then recorded in the
+        checkpoint, so a resumed run continues from the exact next page.
+        """
+        max_pages = search_params['max_pages']
+        warning_limit = quota_warning_threshold(api_cap)
+
+        for i, keyword in enumerate(keywords, 1):
+            print(f"\nProcessing keyword {i}/{len(keywords)}: '{keyword}'")
+
+            start_token, pages_done = self.checkpoint.resume_point(keyword)
+            if pages_done:
+                print(f"  Resuming at page {pages_done + 1}")
+            quota_before = self.quota_used
+            state = {'found': 0, 'kept': 0}
+
+            def save_page(page_videos, keyword_results, next_page_token):
+                sink.add(keyword_results)
+                sink.flush()
+                state['found'] += len(page_videos)
+                state['kept'] += len(keyword_results)
+                self.checkpoint.record_page(keyword, next_page_token,
+                                            quota_before + self.youtube_searcher.quota_used)
+
+            try:
+                # Search videos for this keyword with upload-date range
+                self.youtube_searcher.search_videos(
+                    query=keyword,
+                    quota_limit=api_cap - self.quota_used,
+                    start_page_token=start_token,
+                    on_page=self._page_handler(keyword, self.youtube_searcher, pipeline, save_page),
+                    **dict(search_params, max_pages=max_pages - pages_done)
+                )
+                if self.page_scheduler is not None:
+                    self.page_scheduler.finish(keyword)
+
+                self.quota_used += self.youtube_searcher.quota_used
+                self._record_search(keyword, self.youtube_searcher.pages_fetched,
+                                    self.youtube_searcher.quota_used, self.youtube_searcher.completed,
+                                    max(0, self.pages_per_keyword - pages_done))
+                print(f"  Found {state['found']} videos, quota used so far: {self.quota_used}")
+                print(f"  Kept {state['kept']} videos after filtering")
+
+                if self.youtube_searcher.completed:
+                    self.checkpoint.complete_keyword(keyword, self.quota_used)
+
+                # Check quota limit
+                if warning_limit and self.quota_used >= warning_limit:
+                    print(f"⚠️  90 % quota reached ({self.quota_used}/{api_cap}) – stopping.")
+                    break
+
+            except FATAL_ERRORS as e:
+                # no later keyword can succeed either; the checkpoint keeps this keyword for --resume
+                self.quota_used += self.youtube_searcher.quota_used
+                print(f"  ERROR searching '{keyword}': {str(e)} – stopping.")
+                break
+            except Exception as e:
+                print(f"  ERROR searching '{keyword}': {str(e)}")
+                continue
+
+    def _run_concurrent(self, keywords, search_params, pipeline, api_cap, workers, sink):
+        """
+        Search keywords on a thread pool.
+        All workers draw from one QuotaBudget so api_cap is enforced atomically;
+        results are handed to the sink in keyword order so the output is deterministic.
+        """
+        prior_quota = self.quota_used     # already spent by a resumed run
+        budget = QuotaBudget(api_cap - prior_quota)
+        warning_limit = quota_warning_threshold(api_cap)
+        stop_event = threading.Event()
+        results_by_keyword = {}     # finished keywords waiting for an earlier one
+        next_index = [0]
+
+        def keyword_done(index, keyword_results, completed):
+            """
+            Record a finished keyword and pass every in-order finished keyword to the sink.
+            Keywords are checkpointed as completed once their results are written.
+            """
+            with self._lock:
+                results_by_keyword[index] = (keyword_results, completed)
+                while next_index[0] in results_by_keyword:
+                    keyword_results, completed = results_by_keyword.pop(next_index[0])
+                    sink.add(keyword_results)
+                    if completed:
+                        sink.flush()
+                        self.checkpoint.complete_keyword(keywords[next_index[0]], self.quota_used)
+                    next_index[0] += 1
+
+        def search_keyword(index, keyword):
+            keyword_results = []
+            completed = False
+            if stop_event.is_set():
+                keyword_done(index, keyword_results, completed)
+                return
+            searcher = self.youtube_searcher.clone(quota_budget=budget)
+
+            def collect_page(page_videos, page_results, next_page_token):
+                keyword_results.extend(page_results)
+
+            try:
+                videos = searcher.search_videos(
+                    query=keyword, quota_limit=budget.cap,
+                    on_page=self._page_handler(keyword, searcher, pipeline, collect_page),
+                    **search_params)
+                if self.page_scheduler is not None:
+                    self.page_scheduler.finish(keyword)
+                completed = searcher.completed
+                self._record_search(keyword, searcher.pages_fetched, searcher.quota_used, completed)
+                print(f"Keyword {index + 1}/{len(keywords)} '{keyword}': found {len(videos)}, "
+                      f"kept {len(keyword_results)}, quota used so far: {budget.used}")
+            except FATAL_ERRORS as e:
+                print(f"  ERROR searching '{keyword}': {str(e)} – stopping.")
+                stop_event.set()
+            except Exception as e:
+                print(f"  ERROR searching '{keyword}': {str(e)}")
+            finally:
+                with self._lock:
+                    self.quota_used += searcher.quota_used
+                keyword_done(index, keyword_results, completed)
+
+            if warning_limit and prior_quota + budget.used >= warning_limit and not stop_event.is_set():
+                stop_event.set()
+                print(f"⚠️  90 % quota reached ({prior_quota + budget.used}/{api_cap}) – stopping.")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(search_keyword, i, keyword) for i, keyword in enumerate(keywords)]
+            for future in futures:
+                future.result()
+
+    def _run_batched(self, keywords, search_params, pipeline, api_cap, workers, sink):
+        """
+        Page through search.list for every keyword first, feeding the video IDs into
+        one BatchEnricher, which fetches details in full 50-ID batches and never looks
+        up the same video or channel twice. Filtering then runs per keyword in order.
+        """
+        prior_quota = self.quota_used     # already spent by a resumed run
+        budget = QuotaBudget(api_cap - prior_quota)
+        warning_limit = quota_warning_threshold(api_cap)
+        enricher = BatchEnricher(self.youtube_searcher.clone(quota_budget=budget))
+        stop_event = threading.Event()
+        ids_by_keyword = [[] for _ in keywords]
+        seen_by_keyword = [0 for _ in keywords]
+        completed_by_keyword = [False for _ in keywords]
+
+        def search_keyword(index, keyword):
+            if stop_event.is_set():
+                return
+            searcher = self.youtube_searcher.clone(quota_budget=budget)
+            try:
+                video_ids = searcher.search_video_ids(query=keyword, quota_limit=budget.cap, **search_params)
+                ids_by_keyword[index] = video_ids
+                seen_by_keyword[index] = searcher.seen_skipped
+                completed_by_keyword[index] = searcher.completed
+                self._record_search(keyword, searcher.pages_fetched, searcher.quota_used, searcher.completed)
+                enricher.add_videos(video_ids)
+                print(f"Keyword {index + 1}/{len(keywords)} '{keyword}': found {len(video_ids)} videos, "
+                      f"quota used so far: {budget.used}")
+            except FATAL_ERRORS as e:
+                print(f"  ERROR searching '{keyword}': {str(e)} – stopping.")
+                stop_event.set()
+            except Exception as e:
+                print(f"  ERROR searching '{keyword}': {str(e)}")
+            finally:
+                with self._lock:
+                    self.quota_used += searcher.quota_used
+
+            if warning_limit and prior_quota + budget.used >= warning_limit and not stop_event.is_set():
+                stop_event.set()
+                print(f"⚠️  90 % quota reached ({prior_quota + budget.used}/{api_cap}) – stopping.")
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(search_keyword, i, keyword) for i, keyword in enumerate(keywords)]
+            for future in futures:
+                future.result()
+
+        try:
+            enricher.flush()
+        except FATAL_ERRORS as e:
+            # whatever was enriched is still saved; no keyword is checkpointed as completed
+            print(f"  ERROR enriching videos: {str(e)} – stopping.")
+            completed_by_keyword = [False for _ in keywords]
+        if not enricher.searcher.completed:
+            # a failed or refused videos/channels batch may belong to any keyword
+            completed_by_keyword = [False for _ in keywords]
+        self.quota_used += enricher.quota_used
+        print(f"Enriched {len(enricher.videos)} unique videos from {len(enricher.channels)} channels "
+              f"({enricher.quota_used} quota units)")
+
+        for keyword, video_ids, seen_skipped, completed in zip(keywords, ids_by_keyword, seen_by_keyword,
+                                                               completed_by_keyword):
+            keyword_results = self.filter_videos(keyword, enricher.get_videos(video_ids), pipeline,
+                                                 seen_skipped)
+            sink.add(keyword_results)
+            if completed:
+                sink.flush()
+                self.checkpoint.complete_keyword(keyword, self.quota_used)
             else:
-                log_df = pd.DataFrame([log_data])
-            
-            log_df.to_csv(log_file, index=False)
-            
-        except Exception as e:
-            print(f"Warning: Failed to log run details: {str(e)}")
+                self.keyword_stats.setdefault(keyword, new_keyword_stats())['completed'] = 0
+            print(f"  '{keyword}': kept {len(keyword_results)} videos after filtering")
+
+    async def _run_async(self, keywords, search_params, pipeline, api_cap, sink):
+        """
+        Search all keywords on one event loop with AsyncYouTubeSearcher.
+        In-flight requests are capped by async_max_concurrency and api_cap by a shared QuotaBudget.
+        Each page is filtered and streamed to the sink as soon as it is enriched.
+        """
+        prior_quota = self.quota_used     # already spent by a resumed run
+        budget = QuotaBudget(api_cap - prior_quota)
+        warning_limit = quota_warning_threshold(api_cap)
+        kept_by_keyword = {keyword: 0 for keyword in keywords}
+        cut_short = set()    # keywords stopped by the 90 % warning
+
+        def on_page(keyword, page_videos, seen_skipped, next_page_token):
+            keyword_results = self.filter_videos(keyword, page_videos, pipeline, seen_skipped)
+            kept_by_keyword[keyword] += len(keyword_results)
+            sink.add(keyword_results)
+            if warning_limit and prior_quota + budget.used >= warning_limit:
+                if not cut_short:
+                    print(f"⚠️  90 % quota reached ({prior_quota + budget.used}/{api_cap}) – stopping.")
+                if next_page_token:
+                    cut_short.add(keyword)
+                return False
+            return True
+
+        async with AsyncYouTubeSearcher.from_settings(self.api_key, self.settings) as searcher:
+            searcher.key_pool = self.key_pool
+            searcher.rate_limiter = self.youtube_searcher.rate_limiter
+            searcher.retry_policy = self.youtube_searcher.retry_policy
+            searcher.quota_budget = budget
+            searcher.channel_cache = self.youtube_searcher.channel_cache
+            searcher.response_cache = self.youtube_searcher.response_cache
+            searcher.search_cache = self.youtube_searcher.search_cache
+            searcher.cache_only = self.youtube_searcher.cache_only
+            searcher.seen_filter = self.youtube_searcher.seen_filter
+            self.active_searcher = searcher
+            results = await searcher.search_many(keywords, quota_limit=budget.cap, on_page=on_page,
+                                                 **search_params)
+        self.quota_used += searcher.quota_used
+        sink.flush()
+
+        for i, (keyword, (videos, counter)) in enumerate(zip(keywords, results), 1):
+            stopped = counter.get('stopped') or ('quota' if keyword in cut_short else None)
+            self._record_search(keyword, counter['pages'], counter['quota'], not stopped)
+            if stopped:
+                print(f"Keyword {i}/{len(keywords)} '{keyword}': stopped ({stopped}), "
+                      f"found {len(videos)}, kept {kept_by_keyword[keyword]}")
+                continue
+            self.checkpoint.complete_keyword(keyword, self.quota_used)
+            print(f"Keyword {i}/{len(keywords)} '{keyword}': found {len(videos)}, "
+                  f"kept {kept_by_keyword[keyword]}, quota used: {counter['quota']}")
+
+    def filter_videos(self, keyword, videos, pipeline, seen_skipped=0):
+        """
+        Apply all post-fetch filters, return the kept videos.
+        Already-seen videos were dropped by the searcher before enrichment;
+        <seen_skipped> of them are counted as scanned and skipped here.
+        """
+        keyword_results, skipped = pipeline.apply(videos, keyword)
+
+        with self._lock:
+            self.search_stats['scanned'] += seen_skipped + len(videos)
+            self.search_stats['kept'] += len(keyword_results)
+            self.search_stats['skipped'] += seen_skipped + sum(skipped.values())
+
+            stats = self.keyword_stats.setdefault(keyword, new_keyword_stats())
+            stats['seen'] += seen_skipped
+            for stage, count in skipped.items():
+                stats[stage] += count
+            stats['kept'] += len(keyword_results)
+        return keyword_results
+
+    def _page_handler(self, keyword, searcher, pipeline, handle_page):
+        """
+        Build the search_videos on_page callback for <keyword>: filter each page as it
+        arrives, pass it on as handle_page(page_videos, kept_videos, next_page_token) and,
+        with adaptive_pages, let the PageScheduler decide whether to fetch the next page.
+        """
+        seen_so_far = [0]
+
+        def on_page(page_videos, next_page_token):
+            # Already-seen videos of this page were dropped by the searcher before enrichment
+            seen_skipped = searcher.seen_skipped - seen_so_far[0]
+            seen_so_far[0] = searcher.seen_skipped
+            keyword_results = self.filter_videos(keyword, page_videos, pipeline, seen_skipped)
+            handle_page(page_videos, keyword_results, next_page_token)
+            if self.page_scheduler is not None:
+                return self.page_scheduler.record_page(keyword, seen_skipped + len(page_videos),
+                                                       len(keyword_results))
+            return True
+
+        return on_page
+
+    def _record_search(self, keyword, pages_fetched, quota_used, completed, pages_requested=None):
+        """
+        Add search pages and quota spent on <keyword> to its funnel counters and note whether
+        its search completed; <pages_requested> defaults to the run's pages per keyword
+        """
+        with self._lock:
+            stats = self.keyword_stats.setdefault(keyword, new_keyword_stats())
+            stats['pages_fetched'] += pages_fetched
+            stats['quota_used'] += quota_used
+            stats['pages_requested'] += self.pages_per_keyword if pages_requested is None else pages_requested
+            stats['completed'] = int(completed)
+
+    def log_run(self, start_time, quota_used, keywords_count, results_count):
+        """Log the run details"""
+        self.csv_handler.log_run({
+            'run_timestamp': start_time.strftime('%Y-%m-%d %H:%M:%S'),
+            'estimated_quota_used': quota_used,
+            'keywords_count': keywords_count,
+            'results_count': results_count
+        })
 
 def main():
     parser = argparse.ArgumentParser(description='YouTube Finder - Headless Mode')
     parser.add_argument('--settings', required=True, help='Path to settings JSON file')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue the last interrupted run from data/checkpoint.json')
+    parser.add_argument('--refilter', action='store_true',
+                        help='Re-apply the filters to cached search results without calling the API')
     
     args = parser.parse_args()
     
@@ -264,7 +601,7 @@ def main():
         print(f'ERROR: Settings file not found: {args.settings}')
         sys.exit(1)
     
-    searcher = HeadlessYouTubeSearcher(args.settings)
+    searcher = HeadlessYouTubeSearcher(args.settings, resume=args.resume, refilter=args.refilter)
     success = searcher.run_search()
     
     sys.exit(0 if success else 1)
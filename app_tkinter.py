@@ -9,10 +9,17 @@ import webbrowser
 from datetime import datetime
 from youtube_api import YouTubeSearcher
 from csv_handler import CSVHandler
+from result_sink import ResultSink
+from api_errors import KeyInvalidError, QuotaExceededError
+from quota_manager import KeyPool
+from quota_estimator import QuotaEstimator, estimate_quota
+from query_planner import plan_search_params
+from page_scheduler import PageScheduler, DEFAULT_MIN_KEEP_RATE
+from filters import FilterPipeline, REJECTION_STAGES, new_keyword_stats, format_rejections
 from config_manager import ConfigManager
-from utils import format_duration, parse_duration_minutes, validate_api_key, passes_timeframe_view_filter, quota_warning_threshold, passes_upload_date_filter
+from utils import format_duration, validate_api_key, quota_warning_threshold
 from tkcalendar import DateEntry
-from api_key_manager import get_api_key, set_api_key
+from api_key_manager import get_api_key, get_api_keys, set_api_key
 from api_key_dialog import get_api_key_dialog
 
 class YouTubeFinderTkinter:
@@ -29,7 +36,9 @@ class YouTubeFinderTkinter:
         self.root.config(menu=menubar)
 
         self.config_manager = ConfigManager()
-        self.csv_handler = CSVHandler()
+        settings = self.config_manager.load_settings()
+        self.csv_handler = CSVHandler(settings.get('storage_backend', 'csv'), settings.get('output_format', 'csv'))
+        self.quota_estimator = QuotaEstimator.from_logs(self.csv_handler)
         self.youtube_searcher = None
         self.search_thread = None
         self.stop_search = False
@@ -41,7 +50,10 @@ class YouTubeFinderTkinter:
             self.root.quit()
             return
 
-        self.youtube_searcher = YouTubeSearcher(api_key)
+        self.youtube_searcher = YouTubeSearcher.from_settings(api_key, self.config_manager.load_settings())
+        self.youtube_searcher.seen_filter = self.csv_handler.is_video_seen  # skip seen videos before enrichment
+        self.key_pool = self.create_key_pool(api_key)  # per-key daily quota, shared with headless runs
+        self.youtube_searcher.key_pool = self.key_pool
         self.history_keep_days_var = tk.StringVar()
         self.history_keep_days_var.set(str(self.config_manager.load_settings().get('history_keep_days', '')))
         self.schedule_time_var = tk.StringVar()
@@ -50,6 +62,7 @@ class YouTubeFinderTkinter:
         self.results_df = pd.DataFrame()
         self.quota_used = 0
         self.search_stats = {'scanned': 0, 'kept': 0, 'skipped': 0}
+        self.keyword_stats = {}
 
         os.makedirs('data', exist_ok=True)
         os.makedirs('export', exist_ok=True)
@@ -67,11 +80,21 @@ class YouTubeFinderTkinter:
             else:
                 set_api_key(new_key)
                 if validate_api_key(new_key):
-                    self.youtube_searcher = YouTubeSearcher(new_key)
+                    if self.youtube_searcher:
+                        self.youtube_searcher.close()
+                    self.youtube_searcher = YouTubeSearcher.from_settings(new_key, self.config_manager.load_settings())
+                    self.youtube_searcher.seen_filter = self.csv_handler.is_video_seen
+                    self.key_pool = self.create_key_pool(new_key)
+                    self.youtube_searcher.key_pool = self.key_pool
                     messagebox.showinfo("API Key", "API Key has been saved and applied.")
                 else:
                     messagebox.showerror("API Key", "Invalid API Key format! Please check and re-enter.")
 
+    def create_key_pool(self, api_key):
+        """Pool of the main API key plus any valid YOUTUBE_API_KEYS from apikey.json"""
+        api_keys = [api_key] + [key for key in get_api_keys() if key != api_key and validate_api_key(key)]
+        return KeyPool.from_settings(api_keys, self.config_manager.load_settings())
+
     def check_and_prompt_api_key(self):
         key = get_api_key()
         while not key:
@@ -265,6 +288,14 @@ class YouTubeFinderTkinter:
 
         self.fresh_search_var = tk.BooleanVar(value=False)
         ttk.Checkbutton(parent, text="Fresh search (clear history)", variable=self.fresh_search_var).grid(
+            row=row, column=0, columnspan=2, sticky=tk.W, pady=(0, 4))
+        row += 1
+
+        # Re-run the filters on cached search results: no quota, seen-history left untouched.
+        # Not saved to settings.json, so the scheduled headless run never picks it up.
+        self.refilter_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(parent, text="Re-filter from cache (no API calls)", variable=self.refilter_var,
+                        command=self.update_quota_estimate).grid(
             row=row, column=0, columnspan=2, sticky=tk.W, pady=(0, 6))
         row += 1
 
@@ -319,8 +350,7 @@ class YouTubeFinderTkinter:
         self.quota_used_label.grid(row=1, column=0, sticky=tk.W)
 
         # Daily quota stats
-        quota_today, searches_today = self.get_today_stats()
-        self.daily_quota_label = ttk.Label(status_frame, text=f"Today's quota used: {quota_today} (searches: {searches_today})")
+        self.daily_quota_label = ttk.Label(status_frame, text=self.daily_quota_text())
         self.daily_quota_label.grid(row=2, column=0, sticky=tk.W)
 
         self.progress_var = tk.DoubleVar()
@@ -336,6 +366,8 @@ class YouTubeFinderTkinter:
         self.kept_label.grid(row=0, column=1, padx=(0, 10))
         self.skipped_label = ttk.Label(stats_frame, text="Skipped: 0")
         self.skipped_label.grid(row=0, column=2)
+        self.rejected_label = ttk.Label(stats_frame, text=f"Rejected: {format_rejections({})}")
+        self.rejected_label.grid(row=1, column=0, columnspan=3, sticky=tk.W)
 
         # FILTER BAR
         filter_frame = ttk.LabelFrame(parent, text="Filters", padding="5")
@@ -648,15 +680,23 @@ class YouTubeFinderTkinter:
             messagebox.showerror('Input Error', 'Pages per keyword and API cap must be valid numbers!')
             return
         
-        # Validate quota
-        estimated_quota = self.estimate_quota(keywords_text, pages_per_keyword)
+        # Validate quota (a re-filter from cache makes no API calls)
+        estimated_quota = 0 if self.refilter_var.get() else \
+            self.estimate_quota(keywords_text, pages_per_keyword)['total_quota']
         if estimated_quota > api_cap:
             messagebox.showerror('Quota Error', 
                                f'Estimated quota ({estimated_quota}) exceeds your daily cap ({api_cap})!\n'
                                'Reduce keywords or pages per keyword.')
             return
+        remaining_today = self.key_pool.remaining_today()
+        if remaining_today is not None and estimated_quota > remaining_today:
+            messagebox.showerror('Quota Error',
+                               f'Estimated quota ({estimated_quota}) exceeds the quota left today ({remaining_today})!\n'
+                               'Reduce keywords or pages per keyword, or wait for the daily reset (midnight Pacific time).')
+            return
         
         # Prepare search config
+        settings = self.config_manager.load_settings()
         search_config = {
             'keywords': keywords,
             'pages_per_keyword': pages_per_keyword,
@@ -672,11 +712,16 @@ class YouTubeFinderTkinter:
             'language': self.language_var.get(),
             'skip_hidden': self.skip_hidden_var.get(),
             'fresh_search': self.fresh_search_var.get(),
+            'refilter': self.refilter_var.get(),
             'days_back': self.days_back_var.get().strip(),
             'min_daily_views': self.min_daily_views_var.get().strip(),
             'upload_date_min': self.upload_min_var.get().strip(),
             'upload_date_max': self.upload_max_var.get().strip(),
-            'history_keep_days': self.history_keep_days_var.get().strip()
+            'history_keep_days': self.history_keep_days_var.get().strip(),
+            'dedupe_results': settings.get('dedupe_results', False),
+            'adaptive_pages': settings.get('adaptive_pages', False),
+            'adaptive_max_pages': settings.get('adaptive_max_pages', ''),
+            'adaptive_min_keep_rate': settings.get('adaptive_min_keep_rate', '')
         }
         
         # Update UI state
@@ -684,6 +729,7 @@ class YouTubeFinderTkinter:
         self.stop_button.config(state='normal')
         self.stop_search = False
         self.search_stats = {'scanned': 0, 'kept': 0, 'skipped': 0}
+        self.keyword_stats = {}  # keyword -> funnel counters, logged to logs/keyword_stats.csv
         self.progress_var.set(0)
         
         # Start search thread
@@ -692,35 +738,53 @@ class YouTubeFinderTkinter:
         self.search_thread.start()
 
     def search_worker(self, config):
+        sink = None
         try:
+            # Pick up history written by other runs (e.g. the headless scheduler)
+            self.csv_handler.reload_history()
+            # The searcher lives for the whole session, the retry budget is per search
+            self.youtube_searcher.retry_policy.reset()
+
+            # Re-filter mode serves every call from the caches and ignores the seen-history
+            refilter = config.get('refilter', False)
+            self.youtube_searcher.cache_only = refilter
+            self.youtube_searcher.seen_filter = None if refilter else self.csv_handler.is_video_seen
+
             # Clear history if fresh search
-            if config['fresh_search']:
+            if config['fresh_search'] and not refilter:
                 self.csv_handler.clear_history()
 
             # Auto-clear old history before the main loop
             keep_days_str = config.get('history_keep_days', '').strip()
-            if keep_days_str.isdigit():
+            if keep_days_str.isdigit() and not refilter:
                 keep_days = int(keep_days_str)
                 self.csv_handler.clear_history_older_than(keep_days)
 
-            # Initialize results
+            # Initialize results; kept videos are streamed to the results file and history
             all_results = []
+            today = datetime.now().strftime('%Y-%m-%d')
+            results_file = f'export/results_{today}.csv'
+            if refilter:
+                results_file = f"export/refilter_{datetime.now().strftime('%Y-%m-%d_%H%M%S')}.csv"
+            sink = ResultSink(self.csv_handler, results_file, dedupe=config.get('dedupe_results', False),
+                              record_history=not refilter)
+            pipeline = FilterPipeline.from_settings(dict(config, duration=config['duration_filter']))
             self.quota_used = 0
             total_keywords = len(config['keywords'])
 
-            # timeframe-view parameters
-            days_back = config.get('days_back', '').strip()
-            min_daily_views = config.get('min_daily_views', '').strip()
+            # Push as many filters as possible into the search.list parameters
+            search_params = plan_search_params(dict(config, duration=config['duration_filter']),
+                                               config['pages_per_keyword'])
 
-            # upload-date range parameters
-            upload_date_min = config.get('upload_date_min', '').strip()
-            upload_date_max = config.get('upload_date_max', '').strip()
-
-            # Build RFC-3339 timestamps for YouTube API
-            def _to_rfc(dt_str):
-                return f"{dt_str}T00:00:00Z" if dt_str else ''
-            published_after  = _to_rfc(upload_date_min)
-            published_before = _to_rfc(upload_date_max)
+            # Adaptive pagination: stop unproductive keywords early, give their pages to productive ones
+            scheduler = None
+            if config.get('adaptive_pages', False):
+                scheduler = PageScheduler(
+                    config['pages_per_keyword'],
+                    max_pages=int(config.get('adaptive_max_pages', '') or 0) or None,
+                    min_keep_rate=float(config.get('adaptive_min_keep_rate', '') or DEFAULT_MIN_KEEP_RATE),
+                    history=self.csv_handler.get_keyword_history())
+                search_params['max_pages'] = scheduler.max_pages
 
             # 90 % warning threshold
             warning_limit = quota_warning_threshold(config['api_cap'])
@@ -733,20 +797,51 @@ class YouTubeFinderTkinter:
                 progress = int((i / total_keywords) * 100)
                 self.root.after(0, lambda p=progress: self.progress_var.set(p))
 
+                stats = self.keyword_stats.setdefault(keyword, new_keyword_stats())
+                seen_so_far = [0]
+
+                def on_page(page_videos, next_page_token, keyword=keyword, stats=stats, seen_so_far=seen_so_far):
+                    # Already-seen videos were dropped inside search_videos, before enrichment
+                    seen_skipped = self.youtube_searcher.seen_skipped - seen_so_far[0]
+                    seen_so_far[0] = self.youtube_searcher.seen_skipped
+                    stats['seen'] += seen_skipped
+
+                    # Apply all post-fetch filters to the page's videos at once
+                    kept, skipped = pipeline.apply(page_videos, keyword)
+                    self.search_stats['scanned'] += seen_skipped + len(page_videos)
+                    self.search_stats['skipped'] += seen_skipped + sum(skipped.values())
+                    self.search_stats['kept'] += len(kept)
+                    for stage, count in skipped.items():
+                        stats[stage] += count
+                    stats['kept'] += len(kept)
+                    all_results.extend(kept)
+                    sink.add(kept)
+
+                    # Update stats display
+                    self.root.after(0, self.update_stats_display)
+
+                    if scheduler is not None:
+                        return not self.stop_search and scheduler.record_page(
+                            keyword, seen_skipped + len(page_videos), len(kept))
+                    return not self.stop_search
+
                 try:
-                    # Search videos for this keyword WITH date bounds
-                    videos = self.youtube_searcher.search_videos(
+                    # Search videos for this keyword with the planned API-side filters
+                    self.youtube_searcher.search_videos(
                         query=keyword,
-                        max_pages=config['pages_per_keyword'],
-                        region=config['region'],
-                        language=config['language'],
-                        duration_filter=config['duration_filter'],
                         quota_limit=config['api_cap'] - self.quota_used,
-                        published_after=published_after,
-                        published_before=published_before
+                        on_page=on_page,
+                        **search_params
                     )
+                    if scheduler is not None and not self.stop_search:
+                        # a stopped keyword did not run out of results, so its pages were not saved
+                        scheduler.finish(keyword)
 
                     self.quota_used += self.youtube_searcher.quota_used
+                    stats['pages_fetched'] += self.youtube_searcher.pages_fetched
+                    stats['pages_requested'] += config['pages_per_keyword']
+                    stats['completed'] = int(self.youtube_searcher.completed and not self.stop_search)
+                    stats['quota_used'] += self.youtube_searcher.quota_used
 
                     def _update_quota_label():
                         self.quota_used_label.config(text=f"Current quota used: {self.quota_used}")
@@ -765,83 +860,23 @@ class YouTubeFinderTkinter:
                                 'Search will stop to avoid over-use.'))
                         break
 
-                    for video in videos:
-                        if self.stop_search:
-                            break
-
-                        self.search_stats['scanned'] += 1
-
-                        # Check if already seen
-                        if self.csv_handler.is_video_seen(video['video_id']):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Apply duration filter
-                        duration_minutes = parse_duration_minutes(video.get('duration', ''))
-                        if not self.passes_duration_filter(duration_minutes, config):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Apply view filter (min/max)
-                        view_count = int(video.get('view_count', 0))
-                        views_min = config.get('views_min')
-                        views_max = config.get('views_max')
-                        if views_min and view_count < int(views_min):
-                            self.search_stats['skipped'] += 1
-                            continue
-                        if views_max and view_count > int(views_max):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Time-frame view filter
-                        if not passes_timeframe_view_filter(
-                                view_count,
-                                video.get('published_at', ''),
-                                config.get('days_back', ''),
-                                config.get('min_daily_views', '')):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Upload-date range filter (post-fetch sanity check)
-                        if not passes_upload_date_filter(
-                                video.get('published_at', ''),
-                                config.get('upload_date_min', ''),
-                                config.get('upload_date_max', '')):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Apply subscriber filter (min/max)
-                        subscriber_count = int(video.get('subscriber_count', 0))
-                        subs_min = config.get('subs_min')
-                        subs_max = config.get('subs_max')
-                        if subs_min and subscriber_count < int(subs_min):
-                            self.search_stats['skipped'] += 1
-                            continue
-                        if subs_max and subscriber_count > int(subs_max):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Skip hidden subscriber counts if needed
-                        if config.get('skip_hidden', True) and video.get('hidden_subscriber_count', False):
-                            self.search_stats['skipped'] += 1
-                            continue
-
-                        # Add keyword and duration to video data
-                        video['keyword'] = keyword
-                        video['duration_minutes'] = duration_minutes
-                        all_results.append(video)
-                        self.search_stats['kept'] += 1
-
-                        # Update stats display
-                        self.root.after(0, self.update_stats_display)
-
                     if self.quota_used >= config['api_cap']:
                         self.root.after(0, lambda: messagebox.showinfo('Quota Limit',
                                                                     'Daily quota limit reached!'))
                         break
 
+                except KeyInvalidError as e:
+                    message = str(e)
+                    self.root.after(
+                        0,
+                        lambda: messagebox.showerror(
+                            'Invalid API Key',
+                            f'The YouTube API rejected the API key:\n{message}\n'
+                            'Search has been stopped.'))
+                    self.stop_search = True
+                    break
                 except Exception as e:
-                    if "quota exceeded" in str(e).lower() or "403" in str(e):
+                    if isinstance(e, QuotaExceededError) or "quota exceeded" in str(e).lower() or "403" in str(e):
                         self.root.after(
                             0,
                             lambda: messagebox.showerror(
@@ -860,20 +895,16 @@ class YouTubeFinderTkinter:
                                 f'Error searching keyword "{keyword}": {str(e)}. Continuing with next keyword.'))
                         continue
 
-            # Save results
+            # Write the last buffered results (earlier ones were saved while searching)
+            sink.close()
             if all_results and not self.stop_search:
                 columns = self.tree["columns"]
                 results_df = pd.DataFrame(all_results)
                 # You may need to map from internal field names to display names here!
                 # For now, use the original structure, or adapt as needed.
 
-                today = datetime.now().strftime('%Y-%m-%d')
-                results_file = f'export/results_{today}.csv'
-
-                self.csv_handler.save_results(results_df, results_file)
-                self.csv_handler.update_history([r['video_id'] for r in all_results])
-
-                self.log_run(self.quota_used, len(config['keywords']), len(all_results))
+                if not config.get('refilter', False):
+                    self.log_run(self.quota_used, len(config['keywords']), len(all_results))
                 # Update UI with results
                 self.results_df = results_df
                 self.root.after(0, self.update_results_table)
@@ -883,10 +914,6 @@ class YouTubeFinderTkinter:
                     lambda: messagebox.showinfo(
                         'Search Complete',
                         f'Found {len(all_results)} videos!\nResults saved to: {results_file}'))
-                # Update daily quota label
-                quota_today, searches_today = self.get_today_stats()
-                self.root.after(0, lambda: self.daily_quota_label.config(
-                    text=f"Today's quota used: {quota_today} (searches: {searches_today})"))
             elif not self.stop_search:
                 self.root.after(
                     0,
@@ -898,55 +925,39 @@ class YouTubeFinderTkinter:
                 lambda: messagebox.showerror('Search Error',
                                             f'An error occurred during search: {str(e)}'))
         finally:
+            if sink is not None:
+                sink.close()
+            refilter = config.get('refilter', False)
+            self.youtube_searcher.cache_only = False
+            self.youtube_searcher.seen_filter = self.csv_handler.is_video_seen
+            if not refilter:  # cached pages would skew the quota and keep-rate history
+                self.csv_handler.log_keyword_stats(datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                                                   self.keyword_stats)
+            for cache in (self.youtube_searcher.channel_cache, self.youtube_searcher.response_cache,
+                          self.youtube_searcher.search_cache):
+                if cache is not None:
+                    cache.save()
+            # Update daily quota label and recalibrate the estimate with this run
+            if not refilter:
+                self.key_pool.record_run()
+            self.key_pool.flush()
+            daily_quota_text = self.daily_quota_text()
+            self.root.after(0, lambda: self.daily_quota_label.config(text=daily_quota_text))
+            self.quota_estimator = QuotaEstimator.from_logs(self.csv_handler)
+            self.root.after(0, self.update_quota_estimate)
             self.root.after(0, lambda: self.start_button.config(state='normal'))
             self.root.after(0, lambda: self.stop_button.config(state='disabled'))
             self.root.after(0, lambda: self.progress_var.set(100))
             self.root.after(0, lambda: self.filter_min_date_var.set(''))
             self.root.after(0, lambda: self.filter_max_date_var.set(''))
 
-    def passes_duration_filter(self, duration_minutes, config):
-        duration_filter = config['duration_filter']
-        
-        if duration_filter == 'Any':
-            return True
-        elif duration_filter == 'Short (<4 min)':
-            return duration_minutes < 4
-        elif duration_filter == 'Medium (4-20 min)':
-            return 4 <= duration_minutes <= 20
-        elif duration_filter == 'Long (>20 min)':
-            return duration_minutes > 20
-        elif duration_filter == 'Custom':
-            duration_min = config['duration_min']
-            duration_max = config['duration_max']
-            min_dur = float(duration_min) if duration_min else 0
-            max_dur = float(duration_max) if duration_max else float('inf')
-            return min_dur <= duration_minutes <= max_dur
-        return True
-
-    def passes_view_filter(self, view_count, config):
-        views_min = config['views_min']
-        views_max = config['views_max']
-        
-        if views_min and view_count < int(views_min):
-            return False
-        if views_max and view_count > int(views_max):
-            return False
-        return True
-
-    def passes_subscriber_filter(self, subscriber_count, config):
-        subs_min = config['subs_min']
-        subs_max = config['subs_max']
-        
-        if subs_min and subscriber_count < int(subs_min):
-            return False
-        if subs_max and subscriber_count > int(subs_max):
-            return False
-        return True
-
     def update_stats_display(self):
         self.scanned_label.config(text=f"Scanned: {self.search_stats['scanned']}")
         self.kept_label.config(text=f"Kept: {self.search_stats['kept']}")
         self.skipped_label.config(text=f"Skipped: {self.search_stats['skipped']}")
+        rejected = {stage: sum(stats[stage] for stats in self.keyword_stats.values())
+                    for stage in REJECTION_STAGES}
+        self.rejected_label.config(text=f"Rejected: {format_rejections(rejected)}")
 
     def update_quota_estimate(self, *args):
         """Real-time quota estimate based on live keywords & pages."""
@@ -956,64 +967,39 @@ class YouTubeFinderTkinter:
         except ValueError:
             pages = 2
 
+        if self.refilter_var.get():
+            self.quota_est_label.config(text="Estimated quota: 0 (re-filter from cache)")
+            return
         est = self.estimate_quota(keywords, pages)
-        self.quota_est_label.config(text=f"Estimated quota: {est}")
+        if est['high'] > est['low']:
+            self.quota_est_label.config(
+                text=f"Estimated quota: {est['total_quota']} (90 %: {est['low']}-{est['high']})")
+        else:
+            self.quota_est_label.config(text=f"Estimated quota: {est['total_quota']}")
 
     def estimate_quota(self, keywords_raw, pages_per_keyword):
-        """Return exact YouTube-API quota cost for the live keywords."""
+        """Return the quota estimate for the live keywords, calibrated from past runs."""
         keyword_list = [k.strip() for k in keywords_raw.split('\n') if k.strip()]
-        if not keyword_list:
-            return 0
-
-        SEARCH_COST   = 100
-        VIDEO_COST    = 1
-        CHANNEL_COST  = 1
+        return estimate_quota(keyword_list, pages_per_keyword, self.quota_estimator)
 
-        search_calls  = len(keyword_list) * pages_per_keyword
-        search_quota  = search_calls * SEARCH_COST
-        videos_found  = search_calls * 50 * 0.8
-        video_calls   = max(1, int(videos_found / 50))
-        video_quota   = video_calls * VIDEO_COST
-        channel_quota = video_calls * CHANNEL_COST
-
-        return search_quota + video_quota + channel_quota
-    
     def log_run(self, quota_used, keywords_count, results_count):
         """Log the run details to logs/runs.csv"""
-        try:
-            log_file = 'logs/runs.csv'
-            log_data = {
-                'run_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'quota_used': quota_used,
-                'keywords_count': keywords_count,
-                'results_count': results_count
-            }
-            if os.path.exists(log_file):
-                log_df = pd.read_csv(log_file)
-                log_df = pd.concat([log_df, pd.DataFrame([log_data])], ignore_index=True)
-            else:
-                log_df = pd.DataFrame([log_data])
-            log_df.to_csv(log_file, index=False)
-        except Exception as e:
-            print(f"Warning: Failed to log run details: {str(e)}")
+        self.csv_handler.log_run({
+            'run_timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'quota_used': quota_used,
+            'keywords_count': keywords_count,
+            'results_count': results_count
+        })
 
     def get_today_stats(self):
-        """Return total quota used and searches for today from logs/runs.csv"""
-        try:
-            log_file = 'logs/runs.csv'
-            today = datetime.now().strftime('%Y-%m-%d')
-            if os.path.exists(log_file):
-                log_df = pd.read_csv(log_file)
-                log_df['run_timestamp'] = pd.to_datetime(log_df['run_timestamp'])
-                today_df = log_df[log_df['run_timestamp'].dt.strftime('%Y-%m-%d') == today]
-                quota_used = today_df['quota_used'].sum()
-                searches = len(today_df)
-                return int(quota_used), searches
-            else:
-                return 0, 0
-        except Exception as e:
-            print(f"Warning: Failed to read quota stats: {str(e)}")
-            return 0, 0
+        """Return total quota used and searches for today (Pacific quota day) from the quota ledger"""
+        return self.key_pool.used_today(), self.key_pool.runs_today()
+
+    def daily_quota_text(self):
+        quota_today, searches_today = self.get_today_stats()
+        remaining = self.key_pool.remaining_today()
+        left = f", {remaining} left" if remaining is not None else ''
+        return f"Today's quota used: {quota_today}{left} (searches: {searches_today})"
 
     def stop_search_func(self):
         self.stop_search = True
@@ -0,0 +1,104 @@
+import json
+import os
+import threading
+import time
+
+DEFAULT_CACHE_FILE = 'data/channel_cache.json'
+DEFAULT_TTL_HOURS = 24
+DEFAULT_MAX_ENTRIES = 50000
+
+
+class ChannelCache:
+    """
+    On-disk cache of channel statistics keyed by channel_id.
+    Each entry keeps subscriber_count, hidden_subscriber_count and the time it was fetched.
+    Entries older than the TTL are treated as missing; once the cache grows past
+    max_entries the oldest fetched entries are evicted.
+    """
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, ttl_hours=DEFAULT_TTL_HOURS,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.cache_file = cache_file
+        self.ttl_seconds = float(ttl_hours) * 3600
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = None    # loaded lazily
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+        except Exception as e:
+            print(f"Warning: Failed to load channel cache: {str(e)}")
+
+    def lookup(self, channel_ids):
+        """Return (cached info for fresh entries, list of channel IDs that must be fetched)"""
+        now = time.time()
+        found = {}
+        missing = []
+        with self._lock:
+            self._load()
+            for channel_id in channel_ids:
+                entry = self._entries.get(channel_id)
+                if entry and now - entry.get('fetched_at', 0) < self.ttl_seconds:
+                    found[channel_id] = {
+                        'subscriber_count': entry['subscriber_count'],
+                        'hidden_subscriber_count': entry['hidden_subscriber_count']
+                    }
+                else:
+                    missing.append(channel_id)
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def update(self, channel_info):
+        """Store freshly fetched channel info ({channel_id: info dict})"""
+        if not channel_info:
+            return
+        now = time.time()
+        with self._lock:
+            self._load()
+            for channel_id, info in channel_info.items():
+                self._entries[channel_id] = {
+                    'subscriber_count': info.get('subscriber_count', 0),
+                    'hidden_subscriber_count': info.get('hidden_subscriber_count', False),
+                    'fetched_at': now
+                }
+            self._evict()
+            self._dirty = True
+
+    def _evict(self):
+        """Drop the oldest entries beyond max_entries"""
+        overflow = len(self._entries) - self.max_entries
+        if self.max_entries and overflow > 0:
+            oldest = sorted(self._entries, key=lambda c: self._entries[c].get('fetched_at', 0))
+            for channel_id in oldest[:overflow]:
+                del self._entries[channel_id]
+
+    def save(self):
+        """Write the cache to disk if it changed (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+                tmp_file = f'{self.cache_file}.tmp'
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_file, self.cache_file)
+                self._dirty = False
+            except Exception as e:
+                print(f"Warning: Failed to save channel cache: {str(e)}")
+
+    def clear(self):
+        """Forget all cached channels"""
+        with self._lock:
+            self._entries = {}
+            self._dirty = True
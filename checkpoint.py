@@ -0,0 +1,100 @@
+import json
+import os
+import threading
+from datetime import datetime
+
+DEFAULT_CHECKPOINT_FILE = 'data/checkpoint.json'
+
+
+class Checkpoint:
+    """
+    Progress of a headless run, saved after every page so an interrupted run
+    can be resumed with --resume: completed keywords, the next pageToken and
+    pages already fetched per unfinished keyword, and the quota spent.
+    With checkpoint_file=None progress is only kept in memory (re-filter runs).
+    """
+
+    def __init__(self, checkpoint_file=DEFAULT_CHECKPOINT_FILE):
+        self.checkpoint_file = checkpoint_file
+        self.run_date = datetime.now().strftime('%Y-%m-%d')
+        self.completed = []
+        self.page_tokens = {}   # keyword -> nextPageToken to continue from
+        self.pages_done = {}    # keyword -> pages already fetched
+        self.quota_used = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, checkpoint_file=DEFAULT_CHECKPOINT_FILE):
+        """Return the saved checkpoint, or an empty one if there is none"""
+        checkpoint = cls(checkpoint_file)
+        try:
+            if os.path.exists(checkpoint_file):
+                with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                checkpoint.run_date = data.get('run_date', checkpoint.run_date)
+                checkpoint.completed = data.get('completed', [])
+                checkpoint.page_tokens = data.get('page_tokens', {})
+                checkpoint.pages_done = data.get('pages_done', {})
+                checkpoint.quota_used = data.get('quota_used', 0)
+        except Exception as e:
+            print(f"Warning: Failed to load checkpoint: {str(e)}")
+        return checkpoint
+
+    def is_completed(self, keyword):
+        return keyword in self.completed
+
+    def resume_point(self, keyword):
+        """Return (pageToken to start from or None, pages already fetched) for a keyword"""
+        return self.page_tokens.get(keyword), self.pages_done.get(keyword, 0)
+
+    def record_page(self, keyword, next_page_token, quota_used):
+        """Record one more fetched page for <keyword> and save"""
+        with self._lock:
+            self.pages_done[keyword] = self.pages_done.get(keyword, 0) + 1
+            self.page_tokens[keyword] = next_page_token
+            self.quota_used = quota_used
+            self._save()
+
+    def complete_keyword(self, keyword, quota_used):
+        """Mark <keyword> as fully searched and save"""
+        with self._lock:
+            if keyword not in self.completed:
+                self.completed.append(keyword)
+            self.page_tokens.pop(keyword, None)
+            self.pages_done.pop(keyword, None)
+            self.quota_used = quota_used
+            self._save()
+
+    def save(self, quota_used):
+        """Record the quota spent so far and save"""
+        with self._lock:
+            self.quota_used = quota_used
+            self._save()
+
+    def _save(self):
+        if self.checkpoint_file is None:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.checkpoint_file) or '.', exist_ok=True)
+            tmp_file = f'{self.checkpoint_file}.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'run_date': self.run_date,
+                    'completed': self.completed,
+                    'page_tokens': self.page_tokens,
+                    'pages_done': self.pages_done,
+                    'quota_used': self.quota_used
+                }, f, indent=2)
+            os.replace(tmp_file, self.checkpoint_file)
+        except Exception as e:
+            print(f"Warning: Failed to save checkpoint: {str(e)}")
+
+    def clear(self):
+        """Delete the checkpoint file once a run has finished"""
+        if self.checkpoint_file is None:
+            return
+        try:
+            if os.path.exists(self.checkpoint_file):
+                os.remove(self.checkpoint_file)
+        except Exception as e:
+            print(f"Warning: Failed to remove checkpoint: {str(e)}")
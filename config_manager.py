@@ -30,6 +30,36 @@ class ConfigManager:
             'fresh_search': False,
             'upload_date_min': '',
             'upload_date_max': '',
+            'http_pool_size': '10',
+            'http_max_per_host': '10',
+            'http_timeout': '30',
+            'http_keep_alive': True,
+            'api_base_url': '',
+            'search_engine': 'sync',
+            'concurrent_workers': '1',
+            'pipeline_pages': False,
+            'batch_enrichment': False,
+            'async_max_concurrency': '10',
+            'channel_cache_ttl_hours': '24',
+            'channel_cache_max_entries': '50000',
+            'storage_backend': 'csv',
+            'dedupe_results': False,
+            'result_flush_size': '50',
+            'output_format': 'csv',
+            'adaptive_pages': False,
+            'adaptive_max_pages': '',
+            'adaptive_min_keep_rate': '0.05',
+            'daily_quota': '10000',
+            'rate_limit_per_second': '10',
+            'rate_limit_units_per_minute': '0',
+            'retry_max_attempts': '4',
+            'retry_budget': '50',
+            'retry_base_delay': '1.0',
+            'response_cache_ttl_hours': '1',
+            'response_cache_max_entries': '2000',
+            'search_cache_ttl_hours': '1',
+            'search_cache_max_mb': '50',
+            'refilter_from_cache': False,
         }
     
     def save_settings(self, settings):
@@ -76,7 +106,10 @@ class ConfigManager:
             'views_min': 'Views min',
             'views_max': 'Views max',
             'subs_min': 'Subscribers min',
-            'subs_max': 'Subscribers max'
+            'subs_max': 'Subscribers max',
+            'http_pool_size': 'HTTP pool size',
+            'http_max_per_host': 'HTTP connections per host',
+            'http_timeout': 'HTTP timeout'
         }
 
         for field, display_name in numeric_fields.items():
@@ -1,11 +1,97 @@
+import csv
 import pandas as pd
 import os
+import threading
 from datetime import datetime, timedelta
+from sqlite_store import SQLiteStore, RESULT_COLUMNS, KEYWORD_STATS_COLUMNS
+
+try:
+    import pyarrow  # noqa: F401  optional, only needed for output_format 'parquet' / 'feather'
+except ImportError:
+    pyarrow = None
+
+HISTORY_COLUMNS = ['video_id', 'first_seen_date']
+COMPACT_DUPLICATE_RATIO = 1.2  # compact the history once 20 % of its rows are duplicates
+COMPACT_JOURNAL_ROWS = 10000   # with a columnar snapshot, fold the CSV journal in once it is this long
+COLUMNAR_FORMATS = ('parquet', 'feather')
+COUNT_COLUMNS = ['subscriber_count', 'view_count', 'comments', 'likes']
+
+
+def typed_results(df):
+    """Return results in RESULT_COLUMNS order with explicit dtypes (nullable ints, float minutes, UTC timestamps)"""
+    df = df.reindex(columns=RESULT_COLUMNS)
+    for col in RESULT_COLUMNS:
+        if col in COUNT_COLUMNS:
+            df[col] = pd.to_numeric(df[col], errors='coerce').round().astype('Int64')
+        elif col == 'duration_minutes':
+            df[col] = pd.to_numeric(df[col], errors='coerce').astype('float64')
+        elif col == 'published_at':
+            df[col] = pd.to_datetime(df[col], errors='coerce', utc=True)
+        else:
+            df[col] = df[col].astype('string')
+    return df
+
+
+def typed_history(df):
+    """Return history rows with a string video_id and a datetime first_seen_date"""
+    return pd.DataFrame({
+        'video_id': df['video_id'].astype('string'),
+        'first_seen_date': pd.to_datetime(df['first_seen_date'], errors='coerce')
+    })
+
+
+def read_columnar(filename, columns=None):
+    """Read a .parquet or .feather file"""
+    if filename.endswith('.parquet'):
+        return pd.read_parquet(filename, columns=columns)
+    return pd.read_feather(filename, columns=columns)
+
+
+def write_columnar(df, filename):
+    """Write a .parquet or .feather file via a temp file and an atomic replace"""
+    tmp_file = f'{filename}.tmp'
+    if filename.endswith('.parquet'):
+        df.to_parquet(tmp_file, index=False)
+    else:
+        df.reset_index(drop=True).to_feather(tmp_file)
+    os.replace(tmp_file, filename)
 
 class CSVHandler:
-    def __init__(self):
+    def __init__(self, storage_backend='csv', output_format='csv'):
         self.history_file = 'data/seen_history.csv'
+        self.runs_file = 'logs/runs.csv'
+        self.keyword_stats_file = 'logs/keyword_stats.csv'
+        self._history_index = None  # set of seen video IDs, loaded once per run
+        self._history_lock = threading.RLock()
+        self._results_index = {}    # results filename -> set of video IDs in it (for dedupe)
+        self._results_lock = threading.Lock()
         self._ensure_directories()
+
+        # Optional columnar copies of results and a columnar history snapshot (CSV stays the export format)
+        self.output_format = output_format if output_format in COLUMNAR_FORMATS else 'csv'
+        if self.output_format != 'csv' and pyarrow is None:
+            print(f"Warning: output_format '{output_format}' requires pyarrow (pip install pyarrow); using csv")
+            self.output_format = 'csv'
+        # With a snapshot, seen_history.csv is only a journal of IDs added since the last compaction
+        self.history_snapshot = None
+        if self.output_format != 'csv':
+            self.history_snapshot = f'data/seen_history.{self.output_format}'
+
+        # Optional SQLite backend for history, results and run logs (CSV export stays available)
+        self.store = None
+        if storage_backend == 'sqlite':
+            self.store = SQLiteStore()
+            self._import_csv_history()
+
+    def _import_csv_history(self):
+        """Seed an empty SQLite history table from the existing CSV history"""
+        try:
+            if self.store.history_count() == 0 and self._history_exists():
+                df = self._read_history().dropna(subset=['video_id'])
+                self.store.add_history(df[HISTORY_COLUMNS].fillna('').itertuples(index=False, name=None))
+                print(f"Imported {len(df)} history entries into SQLite")
+        except Exception as e:
+            print(f"Warning: Failed to import CSV history: {str(e)}")
     
     def _ensure_directories(self):
         """Create necessary directories if they don't exist"""
@@ -13,108 +99,258 @@ class CSVHandler:
         os.makedirs('export', exist_ok=True)
         os.makedirs('logs', exist_ok=True)
     
-    def save_results(self, results_df, filename):
-        """Save search results to CSV file, appending to existing data."""
+    def save_results(self, results_df, filename, dedupe=False, quiet=False, store=True):
+        """
+        Append search results to a CSV file.
+        Rows are appended in RESULT_COLUMNS order and the header is only written
+        when the file is created, so the cost is proportional to the new rows.
+        With dedupe=True, videos already in the file are skipped (checked against
+        an in-memory index of the file's video IDs, not by reloading it).
+        With the SQLite backend the rows also go to its results table, unless store=False.
+        """
         try:
-            # Ensure all required columns are present
-            required_columns = [
-                'title', 'description', 'tags', 'video_url', 'video_id',
-                'channel_title', 'channel_id', 'subscriber_count', 'view_count',
-                'comments', 'likes', 'duration_minutes', 'published_at', 'keyword'
-            ]
-            
-            # Add missing columns with default values
-            for col in required_columns:
-                if col not in results_df.columns:
-                    results_df[col] = ''
-            
-            # Reorder columns to match specification
-            results_df = results_df[required_columns]
-            
-            # Check if the file already exists
-            if os.path.exists(filename):
-                # Load existing data
-                existing_df = pd.read_csv(filename)
-                # Append new results to existing data
-                combined_df = pd.concat([existing_df, results_df], ignore_index=True)
-                # Save the combined data
-                combined_df.to_csv(filename, index=False, encoding='utf-8-sig')
-            else:
-                # Save new results if the file does not exist
-                results_df.to_csv(filename, index=False, encoding='utf-8-sig')
-            
-            print(f"Results saved to: {filename}")
+            # Add missing columns with default values and reorder to match specification
+            results_df = results_df.reindex(columns=RESULT_COLUMNS, fill_value='')
+
+            if dedupe:
+                index = self._get_results_index(filename)
+                results_df = results_df.drop_duplicates(subset='video_id')
+                results_df = results_df[~results_df['video_id'].isin(index)]
+
+            with self._results_lock:
+                if not os.path.exists(filename) or os.path.getsize(filename) == 0:
+                    # New file: UTF-8-BOM header for Excel
+                    self._write_atomic(results_df, filename, encoding='utf-8-sig')
+                elif self._read_header(filename) == RESULT_COLUMNS:
+                    self._append_rows(results_df, filename)
+                else:
+                    # File written with an older column layout: rewrite it once in the current order
+                    existing_df = pd.read_csv(filename, dtype=str, encoding='utf-8-sig')
+                    combined_df = pd.concat([existing_df, results_df], ignore_index=True)
+                    self._write_atomic(combined_df.reindex(columns=RESULT_COLUMNS), filename,
+                                       encoding='utf-8-sig')
+
+                if filename in self._results_index:
+                    self._results_index[filename].update(results_df['video_id'].astype(str))
+
+            if self.store is not None and store:
+                self.store.insert_results(results_df, datetime.now().strftime('%Y-%m-%d'))
+
+            if not quiet:
+                print(f"Results saved to: {filename}")
             
         except Exception as e:
             raise Exception(f"Failed to save results: {str(e)}")
+
+    def _get_results_index(self, filename):
+        """Return the set of video IDs in a results file, reading only that column on first use"""
+        with self._results_lock:
+            if filename not in self._results_index:
+                ids = set()
+                if os.path.exists(filename) and os.path.getsize(filename) > 0:
+                    ids = set(pd.read_csv(filename, usecols=['video_id'], dtype=str,
+                                          encoding='utf-8-sig')['video_id'].dropna())
+                self._results_index[filename] = ids
+            return self._results_index[filename]
+
+    def _read_header(self, filename):
+        """Return the column names from the first line of a CSV file"""
+        with open(filename, 'r', newline='', encoding='utf-8-sig') as f:
+            return next(csv.reader(f), [])
+
+    def _append_rows(self, df, filename):
+        """Append DataFrame rows (no header) in a single write and fsync"""
+        with open(filename, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b'\n', b'\r')
+        data = df.to_csv(index=False, header=False)
+        with open(filename, 'a', newline='', encoding='utf-8') as f:
+            f.write(('\n' if needs_newline else '') + data)
+            f.flush()
+            os.fsync(f.fileno())
     
     def load_history(self):
         """Load the seen video history"""
         try:
-            if os.path.exists(self.history_file):
-                history_df = pd.read_csv(self.history_file)
-                return set(history_df['video_id'].tolist())
+            if self.store is not None:
+                return self.store.load_history_ids()
+            if self._history_exists():
+                snapshot_df, journal_df = self._read_history_parts(columns=['video_id'])
+                history_df = pd.concat([snapshot_df, journal_df], ignore_index=True)
+                seen = set(history_df['video_id'].dropna().tolist())
+                # Appends from concurrent runs can leave duplicates; compact once they pile up
+                if (len(history_df) > len(seen) * COMPACT_DUPLICATE_RATIO
+                        or (self.history_snapshot and len(journal_df) >= COMPACT_JOURNAL_ROWS)):
+                    self.compact_history()
+                return seen
             else:
                 return set()
         except Exception as e:
             print(f"Warning: Failed to load history: {str(e)}")
             return set()
     
+    def _get_history_index(self):
+        """Return the in-memory set of seen video IDs, reading the history file on first use"""
+        if self._history_index is None:
+            with self._history_lock:
+                if self._history_index is None:
+                    self._history_index = self.load_history()
+        return self._history_index
+
+    def reload_history(self):
+        """Drop the in-memory history index so the next lookup re-reads the history file"""
+        self._history_index = None
+
     def is_video_seen(self, video_id):
-        """Check if a video ID has been seen before"""
-        try:
-            if not os.path.exists(self.history_file):
-                return False
-            
-            history_df = pd.read_csv(self.history_file)
-            return video_id in history_df['video_id'].values
-            
-        except Exception as e:
-            print(f"Warning: Failed to check video history: {str(e)}")
-            return False
+        """Check if a video ID has been seen before (O(1) lookup in the history index)"""
+        return video_id in self._get_history_index()
     
-    def update_history(self, video_ids):
-        """Add new video IDs to the history"""
+    def update_history(self, video_ids, quiet=False):
+        """
+        Add new video IDs to the history.
+        The history file is append-only: only IDs not already in the index are
+        written, so the cost is proportional to the new IDs, not the whole history.
+        """
         try:
             today = datetime.now().strftime('%Y-%m-%d')
-            
-            # Create new history entries
-            new_entries = pd.DataFrame({
-                'video_id': video_ids,
-                'first_seen_date': today
-            })
-            
-            # Load existing history
-            if os.path.exists(self.history_file):
-                existing_history = pd.read_csv(self.history_file)
-                # Remove duplicates (keep existing first_seen_date)
-                new_entries = new_entries[~new_entries['video_id'].isin(existing_history['video_id'])]
-                # Combine with existing
-                updated_history = pd.concat([existing_history, new_entries], ignore_index=True)
-            else:
-                updated_history = new_entries
-            
-            # Save updated history
-            updated_history.to_csv(self.history_file, index=False)
-            print(f"Updated history with {len(new_entries)} new video IDs")
-            
+            index = self._get_history_index()
+
+            # Remove duplicates (keep existing first_seen_date)
+            new_ids = list(dict.fromkeys(v for v in video_ids if v not in index))
+            if new_ids:
+                rows = [(video_id, today) for video_id in new_ids]
+                if self.store is not None:
+                    self.store.add_history(rows)
+                else:
+                    self._append_history_rows(rows)
+                index.update(new_ids)
+            if not quiet:
+                print(f"Updated history with {len(new_ids)} new video IDs")
+
         except Exception as e:
             print(f"Warning: Failed to update history: {str(e)}")
-    
+
+    def _history_exists(self):
+        return os.path.exists(self.history_file) or bool(
+            self.history_snapshot and os.path.exists(self.history_snapshot))
+
+    def _read_history_parts(self, columns=None):
+        """Return (columnar snapshot rows, CSV journal rows) as string DataFrames"""
+        columns = columns or HISTORY_COLUMNS
+        snapshot_df = pd.DataFrame(columns=columns, dtype=str)
+        journal_df = pd.DataFrame(columns=columns, dtype=str)
+        if self.history_snapshot and os.path.exists(self.history_snapshot):
+            snapshot_df = read_columnar(self.history_snapshot, columns=columns)
+            if 'first_seen_date' in snapshot_df:
+                snapshot_df['first_seen_date'] = snapshot_df['first_seen_date'].dt.strftime('%Y-%m-%d')
+            snapshot_df = snapshot_df.astype(object)
+        if os.path.exists(self.history_file):
+            journal_df = pd.read_csv(self.history_file, usecols=columns, dtype=str)
+        return snapshot_df, journal_df
+
+    def _read_history(self):
+        """Return all history rows (snapshot first, then the journal)"""
+        return pd.concat(self._read_history_parts(), ignore_index=True)
+
+    def _append_history_rows(self, rows):
+        """Append (video_id, first_seen_date) rows and fsync, writing the header on create"""
+        with self._history_lock:
+            needs_header = not os.path.exists(self.history_file) or os.path.getsize(self.history_file) == 0
+            needs_newline = False
+            if not needs_header:
+                # a crash mid-append can leave a partial last line; never glue a new row onto it
+                with open(self.history_file, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    needs_newline = f.read(1) != b'\n'
+
+            with open(self.history_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                if needs_header:
+                    writer.writerow(HISTORY_COLUMNS)
+                elif needs_newline:
+                    f.write('\n')
+                writer.writerows(rows)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact_history(self, keep_days=0):
+        """
+        Rewrite the history file without duplicate IDs (keeping the first
+        first_seen_date) and, when keep_days > 0, without entries older than that.
+        The new file is written next to the old one and swapped in atomically.
+        With a columnar snapshot, everything is folded into the snapshot and the
+        CSV journal is reset to just its header.
+        """
+        if self.store is not None:
+            if keep_days > 0:
+                cutoff = (datetime.now() - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+                self.store.delete_history_before(cutoff)
+                self._history_index = None
+            return
+        if not self._history_exists():
+            return
+        with self._history_lock:
+            df = self._read_history()
+            df = df.dropna(subset=['video_id']).drop_duplicates(subset='video_id', keep='first')
+            if keep_days > 0:
+                cutoff = datetime.now() - timedelta(days=keep_days)
+                seen_dates = pd.to_datetime(df['first_seen_date'], errors='coerce')
+                df = df[seen_dates >= cutoff]
+            if self.history_snapshot:
+                # snapshot first: a crash before the journal reset only leaves harmless duplicates
+                write_columnar(typed_history(df), self.history_snapshot)
+                self._write_atomic(pd.DataFrame(columns=HISTORY_COLUMNS), self.history_file)
+            else:
+                self._write_atomic(df, self.history_file)
+            self._history_index = None
+
+    def _write_atomic(self, df, filename, encoding='utf-8'):
+        """Write a DataFrame to a temp file, fsync it and replace <filename> in one step"""
+        tmp_file = f'{filename}.tmp'
+        with open(tmp_file, 'w', newline='', encoding=encoding) as f:
+            df.to_csv(f, index=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, filename)
+
     def clear_history(self):
         """Clear the video history (for fresh searches)"""
         try:
-            if os.path.exists(self.history_file):
-                os.remove(self.history_file)
+            if self.store is not None:
+                self.store.clear_history()
                 print("History cleared for fresh search")
+            elif self._history_exists():
+                for filename in (self.history_file, self.history_snapshot):
+                    if filename and os.path.exists(filename):
+                        os.remove(filename)
+                print("History cleared for fresh search")
+            self._history_index = set()
         except Exception as e:
             print(f"Warning: Failed to clear history: {str(e)}")
     
+    def export_columnar(self, csv_file):
+        """
+        Write a typed .parquet/.feather copy of a results CSV next to it (output_format setting).
+        Returns the columnar file name, or None when output_format is 'csv'.
+        """
+        if self.output_format == 'csv' or not os.path.exists(csv_file):
+            return None
+        try:
+            columnar_file = f'{os.path.splitext(csv_file)[0]}.{self.output_format}'
+            df = pd.read_csv(csv_file, dtype=str, encoding='utf-8-sig', keep_default_na=False)
+            write_columnar(typed_results(df), columnar_file)
+            return columnar_file
+        except Exception as e:
+            print(f"Warning: Failed to write {self.output_format} results: {str(e)}")
+            return None
+
     def load_results(self, filename):
-        """Load results from a CSV file"""
+        """Load results from a CSV, Parquet or Feather file (with explicit dtypes)"""
         try:
             if os.path.exists(filename):
-                return pd.read_csv(filename)
+                if filename.endswith(COLUMNAR_FORMATS):
+                    return read_columnar(filename)
+                return typed_results(pd.read_csv(filename, dtype=str, encoding='utf-8-sig'))
             else:
                 return pd.DataFrame()
         except Exception as e:
@@ -144,10 +380,12 @@ class CSVHandler:
     def get_history_stats(self):
         """Get statistics about the history file"""
         try:
-            if not os.path.exists(self.history_file):
+            if self.store is not None:
+                return self.store.history_stats()
+            if not self._history_exists():
                 return {'total_videos': 0, 'oldest_date': None, 'newest_date': None}
             
-            history_df = pd.read_csv(self.history_file)
+            history_df = self._read_history()
             
             return {
                 'total_videos': len(history_df),
@@ -162,13 +400,9 @@ class CSVHandler:
     def clear_history_older_than(self, days):
         """Remove history entries older than <days> days (0 = no action)."""
         try:
-            if not os.path.exists(self.history_file) or days <= 0:
+            if days <= 0 or (self.store is None and not self._history_exists()):
                 return
-            cutoff = datetime.now() - timedelta(days=days)
-            df = pd.read_csv(self.history_file)
-            df['first_seen_date'] = pd.to_datetime(df['first_seen_date'], errors='coerce')
-            df = df[df['first_seen_date'] >= cutoff]
-            df.to_csv(self.history_file, index=False)
+            self.compact_history(keep_days=days)
             print(f"Auto-cleared history older than {days} days")
         except Exception as e:
             print(f"Warning: could not auto-clear history: {e}")
@@ -176,3 +410,96 @@ class CSVHandler:
     def clear_history_now(self):
         """Immediately delete the entire history file."""
         self.clear_history()
+
+    def log_run(self, log_data):
+        """Append one run record to logs/runs.csv (or the SQLite runs table)"""
+        try:
+            if self.store is not None:
+                self.store.insert_run(log_data['run_timestamp'],
+                                      log_data.get('quota_used', log_data.get('estimated_quota_used', 0)),
+                                      log_data.get('keywords_count', 0),
+                                      log_data.get('results_count', 0))
+                return
+
+            # Create or append to log file
+            if os.path.exists(self.runs_file):
+                log_df = pd.read_csv(self.runs_file)
+                log_df = pd.concat([log_df, pd.DataFrame([log_data])], ignore_index=True)
+            else:
+                log_df = pd.DataFrame([log_data])
+            log_df.to_csv(self.runs_file, index=False)
+
+        except Exception as e:
+            print(f"Warning: Failed to log run details: {str(e)}")
+
+    def log_keyword_stats(self, run_timestamp, keyword_stats):
+        """
+        Append one row per keyword to logs/keyword_stats.csv (or the SQLite keyword_stats table):
+        pages fetched, quota used, videos rejected at each funnel stage, videos kept, pages
+        requested and whether the keyword's search completed.
+        <keyword_stats> maps keyword -> counters dict (see filters.new_keyword_stats).
+        """
+        try:
+            rows = [tuple([run_timestamp, keyword] + [stats.get(col, 0) for col in KEYWORD_STATS_COLUMNS[2:]])
+                    for keyword, stats in keyword_stats.items()]
+            if not rows:
+                return
+            if self.store is not None:
+                self.store.insert_keyword_stats(rows)
+                return
+
+            needs_header = not os.path.exists(self.keyword_stats_file)
+            if not needs_header:
+                self._upgrade_keyword_stats_file()
+            with open(self.keyword_stats_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f, lineterminator='\n')
+                if needs_header:
+                    writer.writerow(KEYWORD_STATS_COLUMNS)
+                writer.writerows(rows)
+
+        except Exception as e:
+            print(f"Warning: Failed to log keyword stats: {str(e)}")
+
+    def _upgrade_keyword_stats_file(self):
+        """Rewrite a keyword stats log written before its last columns were added, so new rows line up"""
+        with open(self.keyword_stats_file, 'r', encoding='utf-8') as f:
+            header = f.readline().strip().split(',')
+        if header == KEYWORD_STATS_COLUMNS:
+            return
+        stats_df = pd.read_csv(self.keyword_stats_file, dtype={'keyword': str})
+        stats_df.reindex(columns=KEYWORD_STATS_COLUMNS).to_csv(self.keyword_stats_file, index=False,
+                                                               lineterminator='\n')
+
+    def get_keyword_history(self):
+        """Return {keyword: (videos kept, videos scanned)} summed over all runs in the keyword stats log"""
+        try:
+            if self.store is not None:
+                return self.store.keyword_history()
+            if not os.path.exists(self.keyword_stats_file):
+                return {}
+            stats_df = pd.read_csv(self.keyword_stats_file, dtype={'keyword': str})
+            funnel = KEYWORD_STATS_COLUMNS[4:KEYWORD_STATS_COLUMNS.index('kept') + 1]
+            stages = [col for col in funnel if col in stats_df.columns]
+            stats_df['scanned'] = stats_df[stages].sum(axis=1)
+            totals = stats_df.groupby('keyword')[['kept', 'scanned']].sum()
+            return {keyword: (int(row.kept), int(row.scanned)) for keyword, row in totals.iterrows()}
+        except Exception as e:
+            print(f"Warning: Failed to read keyword stats: {str(e)}")
+            return {}
+
+    def get_keyword_pages(self):
+        """
+        Return a DataFrame of run_timestamp, keyword, pages_fetched, pages_requested and completed
+        for every logged keyword search (the last two are empty for rows logged before they existed)
+        """
+        columns = ['run_timestamp', 'keyword', 'pages_fetched', 'pages_requested', 'completed']
+        try:
+            if self.store is not None:
+                return pd.DataFrame(self.store.keyword_pages(), columns=columns)
+            if not os.path.exists(self.keyword_stats_file):
+                return pd.DataFrame(columns=columns)
+            stats_df = pd.read_csv(self.keyword_stats_file, dtype={'keyword': str})
+            return stats_df.reindex(columns=columns)
+        except Exception as e:
+            print(f"Warning: Failed to read keyword stats: {str(e)}")
+            return pd.DataFrame(columns=columns)
@@ -0,0 +1,90 @@
+import threading
+
+BATCH_SIZE = 50  # videos.list / channels.list accept up to 50 IDs per call
+
+
+class BatchEnricher:
+    """
+    Enrichment stage that collects video IDs across search pages and keywords
+    and fetches their details in full 50-ID batches.
+
+    Video and channel IDs are deduplicated, so a video found by several keywords
+    or a channel behind many videos is only looked up once per run. Only full
+    batches are sent while IDs are being added; flush() sends the remainder.
+    """
+
+    def __init__(self, searcher, batch_size=BATCH_SIZE):
+        # pass a searcher of its own (e.g. a clone) so enrichment quota is counted separately
+        self.searcher = searcher
+        self.batch_size = batch_size
+        self.videos = {}        # video_id -> parsed video dict
+        self.channels = {}      # channel_id -> {'subscriber_count', 'hidden_subscriber_count'}
+        self._pending_videos = []
+        self._pending_channels = []
+        self._queued = set()    # every ID ever queued (video and channel IDs never collide)
+        self._lock = threading.Lock()
+
+    @property
+    def quota_used(self):
+        return self.searcher.quota_used
+
+    def add_videos(self, video_ids):
+        """Queue video IDs for enrichment, sending any full batches"""
+        with self._lock:
+            self._queue(self._pending_videos, video_ids)
+        self._send(full_only=True)
+
+    def flush(self):
+        """Send every queued ID, including partial batches"""
+        self._send(full_only=False)
+
+    def get_videos(self, video_ids):
+        """
+        Return enriched copies of the given videos in the given order,
+        merged with their channel info. Unknown IDs are skipped.
+        """
+        videos = []
+        with self._lock:
+            for video_id in video_ids:
+                video = self.videos.get(video_id)
+                if video is None:
+                    continue
+                video = dict(video)
+                video.update(self.channels.get(video['channel_id'], {}))
+                videos.append(video)
+        return videos
+
+    def _queue(self, pending, ids):
+        for item_id in ids:
+            if item_id and item_id not in self._queued:
+                self._queued.add(item_id)
+                pending.append(item_id)
+
+    def _take_batches(self, pending, full_only):
+        batches = []
+        while len(pending) >= self.batch_size or (pending and not full_only):
+            batches.append(pending[:self.batch_size])
+            del pending[:self.batch_size]
+        return batches
+
+    def _send(self, full_only):
+        """
+        Fetch the queued videos, then their channels. Batches are taken out under the
+        lock and the API is called outside it, so other workers can keep queueing IDs.
+        """
+        with self._lock:
+            video_batches = self._take_batches(self._pending_videos, full_only)
+        for batch in video_batches:
+            # quota_remaining=0: no per-call limit, the searcher's QuotaBudget still applies
+            videos = self.searcher._get_video_details(batch, 0)
+            with self._lock:
+                for video in videos:
+                    self.videos[video['video_id']] = video
+                    self._queue(self._pending_channels, [video['channel_id']])
+
+        with self._lock:
+            channel_batches = self._take_batches(self._pending_channels, full_only)
+        for batch in channel_batches:
+            channels = self.searcher._get_channel_details(batch, 0)
+            with self._lock:
+                self.channels.update(channels)
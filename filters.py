@@ -0,0 +1,211 @@
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime, timedelta, timezone
+from utils import parse_duration_minutes
+
+# Post-fetch filters in the order they are applied; a rejected video is counted
+# against the first filter it fails
+FILTER_NAMES = ['duration', 'views', 'timeframe', 'upload_date', 'hidden_subs', 'subscribers']
+
+# Funnel stages a video can be dropped at: the seen-history dedupe, then each filter
+REJECTION_STAGES = ['seen'] + FILTER_NAMES
+
+# duration filter -> (min minutes, max minutes, bounds inclusive)
+DURATION_BUCKETS = {
+    'Short (<4 min)': (None, 4, False),
+    'Medium (4-20 min)': (4, 20, True),
+    'Long (>20 min)': (20, None, False),
+}
+
+ISO_DURATION = r'^P(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$'
+
+
+def new_keyword_stats():
+    """
+    Zeroed funnel counters for one keyword: pages, quota, rejections per stage and kept videos,
+    plus the pages requested and whether the search completed (1) or was cut short (0)
+    """
+    stats = {'pages_fetched': 0, 'quota_used': 0}
+    stats.update(dict.fromkeys(REJECTION_STAGES, 0))
+    stats['kept'] = 0
+    stats['pages_requested'] = 0
+    stats['completed'] = 0
+    return stats
+
+
+def format_rejections(counts):
+    """One-line summary of rejections per stage, e.g. 'seen 12, duration 3, views 0, ...'"""
+    return ', '.join(f"{stage} {counts.get(stage, 0)}" for stage in REJECTION_STAGES)
+
+
+def _to_int(value):
+    value = str(value).strip() if value is not None else ''
+    return int(value) if value else None
+
+
+def _to_float(value):
+    value = str(value).strip() if value is not None else ''
+    return float(value) if value else None
+
+
+def duration_minutes_series(durations):
+    """Vectorized ISO 8601 duration -> minutes, falling back to utils.parse_duration_minutes"""
+    durations = durations.fillna('').astype(str)
+    parts = durations.str.extract(ISO_DURATION).astype(float).fillna(0)
+    minutes = parts[0] * 1440 + parts[1] * 60 + parts[2] + parts[3] / 60
+    unmatched = ~durations.str.match(ISO_DURATION) & (durations != '')
+    if unmatched.any():
+        minutes[unmatched] = durations[unmatched].map(parse_duration_minutes)
+    return minutes
+
+
+class FilterPipeline:
+    """
+    Post-fetch video filters shared by the GUI and the headless runner.
+    The settings are parsed once into bounds; apply() then evaluates a whole
+    page of videos as DataFrame masks and counts rejections per filter.
+    """
+
+    def __init__(self, duration='Any', duration_min='', duration_max='', views_min='', views_max='',
+                 subs_min='', subs_max='', skip_hidden=True, days_back='', min_daily_views='',
+                 upload_date_min='', upload_date_max=''):
+        # duration bounds in minutes
+        self.duration_min, self.duration_max, self.duration_inclusive = None, None, True
+        if duration in DURATION_BUCKETS:
+            self.duration_min, self.duration_max, self.duration_inclusive = DURATION_BUCKETS[duration]
+        elif duration == 'Custom':
+            self.duration_min = _to_float(duration_min)
+            self.duration_max = _to_float(duration_max)
+
+        self.views_min = _to_int(views_min)
+        self.views_max = _to_int(views_max)
+        self.subs_min = _to_int(subs_min)
+        self.subs_max = _to_int(subs_max)
+        self.skip_hidden = bool(skip_hidden)
+
+        # time-frame views: only active when both values are positive numbers;
+        # videos must be published in the last <days_back> days and average <min_daily_views> a day
+        self.min_daily_views = self.days_back = None
+        try:
+            if days_back and min_daily_views and int(days_back) > 0 and float(min_daily_views) > 0:
+                self.days_back = int(days_back)
+                self.min_daily_views = float(min_daily_views)
+        except (ValueError, TypeError):
+            pass
+
+        # upload-date range in UTC, max date inclusive
+        self.upload_after = self.upload_before = None
+        if upload_date_min:
+            self.upload_after = pd.Timestamp(datetime.strptime(upload_date_min, '%Y-%m-%d'), tz=timezone.utc)
+        if upload_date_max:
+            self.upload_before = pd.Timestamp(datetime.strptime(upload_date_max, '%Y-%m-%d')
+                                              + timedelta(days=1), tz=timezone.utc)
+
+        self.skipped = dict.fromkeys(FILTER_NAMES, 0)  # rejections per filter over all apply() calls
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Compile a pipeline from settings.json-style keys"""
+        return cls(duration=settings.get('duration', 'Any'),
+                   duration_min=settings.get('duration_min', ''),
+                   duration_max=settings.get('duration_max', ''),
+                   views_min=settings.get('views_min', ''),
+                   views_max=settings.get('views_max', ''),
+                   subs_min=settings.get('subs_min', ''),
+                   subs_max=settings.get('subs_max', ''),
+                   skip_hidden=settings.get('skip_hidden', True),
+                   days_back=settings.get('days_back', ''),
+                   min_daily_views=settings.get('min_daily_views', ''),
+                   upload_date_min=settings.get('upload_date_min', ''),
+                   upload_date_max=settings.get('upload_date_max', ''))
+
+    def masks(self, df):
+        """Return {filter name: boolean Series of videos passing it} for a DataFrame of videos"""
+        passing = {}
+        all_pass = pd.Series(True, index=df.index)
+
+        minutes = df['duration_minutes']
+        duration_ok = all_pass.copy()
+        if self.duration_min is not None:
+            duration_ok &= (minutes >= self.duration_min) if self.duration_inclusive \
+                else (minutes > self.duration_min)
+        if self.duration_max is not None:
+            duration_ok &= (minutes <= self.duration_max) if self.duration_inclusive \
+                else (minutes < self.duration_max)
+        passing['duration'] = duration_ok
+
+        views = df['view_count']
+        views_ok = all_pass.copy()
+        if self.views_min is not None:
+            views_ok &= views >= self.views_min
+        if self.views_max is not None:
+            views_ok &= views <= self.views_max
+        passing['views'] = views_ok
+
+        published = pd.to_datetime(df['published_at'], errors='coerce', utc=True)
+        timeframe_ok = all_pass.copy()
+        if self.min_daily_views is not None:
+            # whole days since publishing; same-day videos count as one day
+            now = pd.Timestamp.now(tz=timezone.utc)
+            days = ((now - published).dt.days).astype(float)
+            daily = np.where(days <= 0, views, views / days.where(days > 0, 1))
+            in_window = published >= now - pd.Timedelta(days=self.days_back)
+            timeframe_ok = published.isna() | ((daily >= self.min_daily_views) & in_window)
+        passing['timeframe'] = timeframe_ok
+
+        upload_ok = all_pass.copy()
+        if self.upload_after is not None:
+            upload_ok &= published.isna() | (published >= self.upload_after)
+        if self.upload_before is not None:
+            upload_ok &= published.isna() | (published < self.upload_before)
+        passing['upload_date'] = upload_ok
+
+        passing['hidden_subs'] = ~df['hidden_subscriber_count'] if self.skip_hidden else all_pass
+
+        subs = df['subscriber_count']
+        subs_ok = all_pass.copy()
+        if self.subs_min is not None:
+            subs_ok &= subs >= self.subs_min
+        if self.subs_max is not None:
+            subs_ok &= subs <= self.subs_max
+        passing['subscribers'] = subs_ok
+        return passing
+
+    def apply(self, videos, keyword=None):
+        """
+        Filter a list of video dicts.
+        Returns (kept videos with 'duration_minutes' and 'keyword' set, {filter name: rejected count}).
+        """
+        skipped = dict.fromkeys(FILTER_NAMES, 0)
+        if not videos:
+            return [], skipped
+
+        df = pd.DataFrame({
+            'duration_minutes': duration_minutes_series(pd.Series([v.get('duration', '') for v in videos])),
+            'view_count': pd.to_numeric(pd.Series([v.get('view_count', 0) for v in videos]),
+                                        errors='coerce').fillna(0),
+            'subscriber_count': pd.to_numeric(pd.Series([v.get('subscriber_count', 0) for v in videos]),
+                                              errors='coerce').fillna(0),
+            'published_at': [v.get('published_at', '') for v in videos],
+            'hidden_subscriber_count': [bool(v.get('hidden_subscriber_count', False)) for v in videos],
+        })
+
+        remaining = pd.Series(True, index=df.index)
+        for name, passed in self.masks(df).items():
+            skipped[name] = int((remaining & ~passed).sum())
+            remaining &= passed
+
+        kept = []
+        for i in np.flatnonzero(remaining.to_numpy()):
+            video = videos[i]
+            video['duration_minutes'] = float(df['duration_minutes'].iat[i])
+            if keyword is not None:
+                video['keyword'] = keyword
+            kept.append(video)
+
+        with self._lock:
+            for name, count in skipped.items():
+                self.skipped[name] += count
+        return kept, skipped
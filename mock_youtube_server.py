@@ -0,0 +1,148 @@
+"""
+Local mock of the YouTube Data API v3 (search, videos and channels endpoints)
+for testing the sync and async searchers offline.
+
+Run it, then point the app at it with "api_base_url" in settings.json:
+
+    python mock_youtube_server.py --port 8765
+    "api_base_url": "http://127.0.0.1:8765/youtube/v3"
+"""
+import argparse
+import hashlib
+import json
+import random
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+
+def _number(seed, low, high):
+    """Deterministic pseudo-random integer in [low, high] derived from <seed>"""
+    digest = int(hashlib.md5(seed.encode('utf-8')).hexdigest(), 16)
+    return low + digest % (high - low + 1)
+
+
+class MockYouTubeHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, like googleapis.com
+    pages = 5
+    latency = 0.0
+    key_quota = 0       # units each API key may spend before quotaExceeded (0 = unlimited)
+    key_used = {}       # API key -> units spent
+    error_rate = 0.0    # share of requests answered with a transient 503 backendError
+    costs = {'search': 100, 'videos': 1, 'channels': 1}
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        endpoint = url.path.rstrip('/').rsplit('/', 1)[-1]
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if not query.get('key'):
+            return self._send(400, {'error': {'code': 400, 'message': 'API key missing',
+                                              'errors': [{'reason': 'keyInvalid'}]}})
+        if self.error_rate and random.random() < self.error_rate:
+            return self._send(503, {'error': {'code': 503, 'message': 'Backend Error',
+                                              'errors': [{'reason': 'backendError'}]}})
+        if self.key_quota:
+            used = self.key_used.get(query['key'], 0)
+            if used + self.costs.get(endpoint, 1) > self.key_quota:
+                return self._send(403, {'error': {'code': 403, 'message': 'Quota exceeded',
+                                                  'errors': [{'reason': 'quotaExceeded'}]}})
+            self.key_used[query['key']] = used + self.costs.get(endpoint, 1)
+        if endpoint == 'search':
+            body = self._search(query)
+        elif endpoint == 'videos':
+            body = {'items': [self._video(video_id) for video_id in query.get('id', '').split(',') if video_id]}
+        elif endpoint == 'channels':
+            body = {'items': [self._channel(channel_id) for channel_id in query.get('id', '').split(',') if channel_id]}
+        else:
+            return self._send(404, {'error': {'code': 404, 'message': f'Unknown endpoint {endpoint}'}})
+        # ETags as in the real API: a conditional request for an unchanged response gets a bodyless 304
+        etag = '"' + hashlib.md5(json.dumps(body, sort_keys=True).encode('utf-8')).hexdigest() + '"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body['etag'] = etag
+        self._send(200, body, {'ETag': etag})
+
+    def _search(self, query):
+        page = int(query.get('pageToken', '0') or 0)
+        slug = query.get('q', '').replace(' ', '_')
+        body = {'items': [{'id': {'kind': 'youtube#video', 'videoId': f'{slug}_{page}_{i}'}}
+                          for i in range(int(query.get('maxResults', 50)))]}
+        if page + 1 < self.pages:
+            body['nextPageToken'] = str(page + 1)
+        return body
+
+    def _video(self, video_id):
+        return {
+            'id': video_id,
+            'snippet': {
+                'title': f'Mock video {video_id}',
+                'description': 'Served by mock_youtube_server.py',
+                'tags': ['mock'],
+                'channelTitle': f'Mock channel {video_id[-1]}',
+                'channelId': f'UC_mock_{_number(video_id, 0, 19)}',
+                'publishedAt': f'2024-{_number(video_id, 1, 12):02d}-{_number(video_id + "d", 1, 28):02d}T12:00:00Z'
+            },
+            'statistics': {
+                'viewCount': str(_number(video_id, 100, 5000000)),
+                'likeCount': str(_number(video_id + 'l', 0, 50000)),
+                'commentCount': str(_number(video_id + 'c', 0, 5000))
+            },
+            'contentDetails': {'duration': f'PT{_number(video_id, 0, 59)}M{_number(video_id + "s", 0, 59)}S'}
+        }
+
+    def _channel(self, channel_id):
+        return {
+            'id': channel_id,
+            'statistics': {
+                'subscriberCount': str(_number(channel_id, 10, 2000000)),
+                'hiddenSubscriberCount': _number(channel_id, 0, 9) == 0
+            }
+        }
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock YouTube Data API server for offline testing')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--pages', type=int, default=5, help='Search result pages per query')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds of delay added to each response')
+    parser.add_argument('--key-quota', type=int, default=0,
+                        help='Units each API key may spend before quotaExceeded (0 = unlimited)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help='Share of requests failed with a transient 503 backendError (0-1)')
+    args = parser.parse_args()
+
+    MockYouTubeHandler.pages = args.pages
+    MockYouTubeHandler.latency = args.latency
+    MockYouTubeHandler.key_quota = args.key_quota
+    MockYouTubeHandler.error_rate = args.error_rate
+    server = ThreadingHTTPServer(('127.0.0.1', args.port), MockYouTubeHandler)
+    print(f"Mock YouTube API listening on http://127.0.0.1:{args.port}/youtube/v3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
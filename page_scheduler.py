@@ -0,0 +1,72 @@
+import threading
+
+DEFAULT_MIN_KEEP_RATE = 0.05    # keywords keeping fewer than 5 % of scanned videos stop paging
+HISTORY_WEIGHT = 100            # past runs count as at most this many scanned videos
+
+
+class PageScheduler:
+    """
+    Decides per keyword whether the next search page is worth 100 quota units.
+
+    Every keyword gets its first page. After each page the keyword's keep rate
+    (kept / scanned, blended with its keep rate from past runs) is checked:
+    keywords below min_keep_rate stop early and release the rest of their
+    <pages> budget into a shared pool, and productive keywords that used up
+    <pages> may take pages from that pool up to <max_pages>.
+    Thread-safe, so concurrent workers can share one scheduler.
+    """
+
+    def __init__(self, pages, max_pages=None, min_keep_rate=DEFAULT_MIN_KEEP_RATE, history=None):
+        self.pages = pages
+        self.max_pages = max(pages, max_pages or pages * 2)
+        self.min_keep_rate = min_keep_rate
+        self.history = history or {}    # keyword -> (kept, scanned) summed over past runs
+        self.spare_pages = 0            # pages released by unproductive keywords
+        self.pages_saved = 0            # pages released and never reused
+        self._keywords = {}
+        self._lock = threading.Lock()
+
+    def keep_rate(self, keyword):
+        """Kept / scanned for <keyword> this run, blended with its (down-weighted) history"""
+        state = self._keywords.get(keyword, {'kept': 0, 'scanned': 0})
+        kept, scanned = state['kept'], state['scanned']
+        past_kept, past_scanned = self.history.get(keyword, (0, 0))
+        if past_scanned:
+            weight = min(1.0, HISTORY_WEIGHT / past_scanned)
+            kept += past_kept * weight
+            scanned += past_scanned * weight
+        return kept / scanned if scanned else 1.0
+
+    def record_page(self, keyword, scanned, kept):
+        """Record one page for <keyword>; return True if its next page should be fetched"""
+        with self._lock:
+            state = self._keywords.setdefault(keyword, {'pages': 0, 'kept': 0, 'scanned': 0,
+                                                        'released': False})
+            state['pages'] += 1
+            state['scanned'] += scanned
+            state['kept'] += kept
+
+            if self.keep_rate(keyword) < self.min_keep_rate:
+                self._release(state)
+                return False
+            if state['pages'] < self.pages:
+                return True
+            if state['pages'] < self.max_pages and self.spare_pages > 0:
+                self.spare_pages -= 1
+                self.pages_saved -= 1
+                return True
+            return False
+
+    def finish(self, keyword):
+        """Release the unused page budget of a keyword that ran out of results"""
+        with self._lock:
+            state = self._keywords.setdefault(keyword, {'pages': 0, 'kept': 0, 'scanned': 0,
+                                                        'released': False})
+            self._release(state)
+
+    def _release(self, state):
+        if not state['released']:
+            state['released'] = True
+            unused = max(0, self.pages - state['pages'])
+            self.spare_pages += unused
+            self.pages_saved += unused
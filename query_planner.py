@@ -0,0 +1,92 @@
+from datetime import datetime, timedelta, timezone
+
+
+def _to_float(value, default):
+    try:
+        return float(value) if str(value).strip() else default
+    except (ValueError, TypeError):
+        return default
+
+
+def _to_rfc(day):
+    """datetime -> RFC-3339 timestamp at 00:00 UTC of that day"""
+    return day.strftime('%Y-%m-%dT00:00:00Z')
+
+
+def plan_duration(duration, duration_min='', duration_max=''):
+    """
+    Return the duration_filter label to send to search.list.
+    A custom range is mapped onto the tightest videoDuration bucket that fully
+    covers it ('Any' when it spans buckets); the exact range stays a client-side filter.
+    """
+    if duration != 'Custom':
+        return duration
+    low = _to_float(duration_min, 0)
+    high = _to_float(duration_max, float('inf'))
+    # bucket edges: short < 4, 4 <= medium <= 20, long > 20
+    if high < 4:
+        return 'Short (<4 min)'
+    if low >= 4 and high <= 20:
+        return 'Medium (4-20 min)'
+    if low > 20:
+        return 'Long (>20 min)'
+    return 'Any'
+
+
+def plan_published_range(upload_date_min='', upload_date_max='', days_back='', min_daily_views='',
+                         now=None):
+    """
+    Return (published_after, published_before) RFC-3339 bounds for search.list.
+    The upload-date range is sent as-is (max date inclusive). An active time-frame
+    views filter also bounds the publish date to the last <days_back> days,
+    rounded down to midnight UTC so the bound is stable within a day.
+    """
+    now = now or datetime.now(timezone.utc)
+    after = datetime.strptime(upload_date_min, '%Y-%m-%d') if upload_date_min else None
+    before = datetime.strptime(upload_date_max, '%Y-%m-%d') + timedelta(days=1) if upload_date_max else None
+
+    try:
+        if days_back and min_daily_views and int(days_back) > 0 and float(min_daily_views) > 0:
+            window_start = (now - timedelta(days=int(days_back))).replace(tzinfo=None)
+            if after is None or window_start > after:
+                after = window_start
+    except (ValueError, TypeError):
+        pass
+
+    return (_to_rfc(after) if after else '', _to_rfc(before) if before else '')
+
+
+def plan_search_params(settings, max_pages):
+    """
+    Map the settings onto search.list parameters (region, language, videoDuration,
+    publishedAfter/Before) so the API drops as many videos as possible.
+    Returns keyword arguments for YouTubeSearcher.search_videos; the FilterPipeline
+    still checks every filter client-side, so only the residual work happens locally.
+    """
+    published_after, published_before = plan_published_range(
+        settings.get('upload_date_min', '').strip(),
+        settings.get('upload_date_max', '').strip(),
+        settings.get('days_back', '').strip(),
+        settings.get('min_daily_views', '').strip())
+    return {
+        'max_pages': max_pages,
+        'region': settings.get('region', ''),
+        'language': settings.get('language', ''),
+        'duration_filter': plan_duration(settings.get('duration', 'Any'),
+                                         settings.get('duration_min', ''),
+                                         settings.get('duration_max', '')),
+        'published_after': published_after,
+        'published_before': published_before
+    }
+
+
+def describe_plan(search_params):
+    """One-line description of the API-side filters in a plan"""
+    parts = []
+    if search_params['duration_filter'] not in ('Any', ''):
+        parts.append(f"videoDuration={search_params['duration_filter']}")
+    for key, name in (('published_after', 'publishedAfter'), ('published_before', 'publishedBefore'),
+                      ('region', 'regionCode'), ('language', 'relevanceLanguage')):
+        if search_params.get(key):
+            parts.append(f"{name}={search_params[key]}")
+    return ', '.join(parts) or 'no API-side filters'
@@ -0,0 +1,128 @@
+import math
+import os
+import pandas as pd
+from quota_manager import DEFAULT_CALLS_LOG, ENDPOINT_COSTS
+
+SEARCH_COST = ENDPOINT_COSTS['search']
+MAX_ENRICH_CALLS = 1    # a 50-result page needs at most one videos.list and one channels.list call
+PRIOR_RUNS = 3          # pseudo-runs of the all-keyword average blended into each keyword's history
+Z_90 = 1.645            # two-sided 90 % confidence bounds
+
+
+class QuotaEstimator:
+    """
+    Predicts the quota a search will use, calibrated from past runs.
+
+    logs/keyword_stats.csv tells how many of the requested pages each keyword
+    actually returned; only keywords whose search completed are used, since one
+    stopped by quota, an error or the user says nothing about its results.
+    Rows logged before pages_requested / completed existed fall back to the
+    run's busiest keyword as the requested pages. logs/quota_calls.csv
+    tells how many videos.list and channels.list calls a search page costs
+    on average (fewer when videos were already seen or channels cached).
+    Keywords with little history lean on the average over all keywords.
+    Without any history every requested page is assumed to be fetched and enriched.
+    """
+
+    def __init__(self, keyword_pages=None, video_calls_per_page=MAX_ENRICH_CALLS,
+                 channel_calls_per_page=MAX_ENRICH_CALLS):
+        self.video_calls_per_page = video_calls_per_page
+        self.channel_calls_per_page = channel_calls_per_page
+        self.runs = 0
+        self.page_ratio = 1.0       # share of requested pages fetched, over all keywords
+        self.page_ratio_var = 0.0
+        self.keywords = {}          # keyword -> (runs, mean page ratio, page ratio variance)
+        if keyword_pages is not None and len(keyword_pages):
+            self._calibrate_pages(keyword_pages)
+
+    @classmethod
+    def from_logs(cls, csv_handler, calls_log=DEFAULT_CALLS_LOG):
+        """Calibrate from the keyword stats log and the quota ledger's call log"""
+        video_calls = channel_calls = MAX_ENRICH_CALLS
+        try:
+            if os.path.exists(calls_log):
+                calls_df = pd.read_csv(calls_log, usecols=['endpoint', 'units'])
+                calls = calls_df[calls_df['units'] > 0]['endpoint'].value_counts()
+                if calls.get('search', 0):
+                    video_calls = calls.get('videos', 0) / calls['search']
+                    channel_calls = calls.get('channels', 0) / calls['search']
+        except Exception as e:
+            print(f"Warning: Failed to read API call log: {str(e)}")
+        return cls(csv_handler.get_keyword_pages(), video_calls, channel_calls)
+
+    def _calibrate_pages(self, keyword_pages):
+        df = keyword_pages.reindex(columns=['run_timestamp', 'keyword', 'pages_fetched',
+                                            'pages_requested', 'completed'])
+        df['pages_fetched'] = pd.to_numeric(df['pages_fetched'], errors='coerce').fillna(0)
+        requested = pd.to_numeric(df['pages_requested'], errors='coerce')
+        completed = pd.to_numeric(df['completed'], errors='coerce')
+        logged = requested.notna() & completed.notna()
+        # older rows: pages requested ~ pages fetched by the run's busiest keyword,
+        # and a keyword that fetched nothing was stopped or skipped
+        busiest = df.groupby('run_timestamp')['pages_fetched'].transform('max')
+        df['requested'] = requested.where(logged, busiest)
+        finished = (logged & (completed == 1)) | (~logged & (df['pages_fetched'] > 0))
+        df = df[finished & (df['requested'] > 0)].copy()
+        if df.empty:
+            return
+        df['ratio'] = df['pages_fetched'] / df['requested']
+
+        self.runs = df['run_timestamp'].nunique()
+        self.page_ratio = float(df['ratio'].mean())
+        self.page_ratio_var = float(df['ratio'].var(ddof=0))
+        for keyword, ratios in df.groupby('keyword')['ratio']:
+            count = len(ratios)
+            mean = (ratios.sum() + PRIOR_RUNS * self.page_ratio) / (count + PRIOR_RUNS)
+            var = (count * ratios.var(ddof=0) + PRIOR_RUNS * self.page_ratio_var) / (count + PRIOR_RUNS)
+            self.keywords[keyword] = (count, float(mean), float(var))
+
+    def page_cost(self):
+        """Expected units per search page: search.list plus its enrichment calls"""
+        return (SEARCH_COST + self.video_calls_per_page * ENDPOINT_COSTS['videos']
+                + self.channel_calls_per_page * ENDPOINT_COSTS['channels'])
+
+    def estimate_keyword(self, keyword, pages):
+        """Return (expected pages, page standard deviation) for <pages> requested pages of <keyword>"""
+        _, ratio, var = self.keywords.get(keyword, (0, self.page_ratio, self.page_ratio_var))
+        # the first page is always fetched
+        return max(1.0, pages * ratio), pages * math.sqrt(var)
+
+    def estimate(self, keywords, pages):
+        """
+        Estimate the quota for searching <keywords> with <pages> pages each.
+        Returns a dict with the expected 'total_quota', its 90 % bounds 'low' and 'high',
+        the search/video/channel split and {keyword: expected units} in 'per_keyword'.
+        """
+        if not keywords or pages <= 0:
+            return {'total_quota': 0, 'low': 0, 'high': 0, 'search_quota': 0, 'video_quota': 0,
+                    'channel_quota': 0, 'expected_pages': 0, 'per_keyword': {}, 'calibrated_runs': self.runs}
+
+        page_cost = self.page_cost()
+        expected_pages = variance = 0.0
+        per_keyword = {}
+        for keyword in keywords:
+            keyword_pages, pages_sd = self.estimate_keyword(keyword, pages)
+            expected_pages += keyword_pages
+            variance += pages_sd ** 2
+            per_keyword[keyword] = int(round(keyword_pages * page_cost))
+
+        total = expected_pages * page_cost
+        margin = Z_90 * math.sqrt(variance) * page_cost
+        floor = len(keywords) * SEARCH_COST
+        ceiling = len(keywords) * pages * (SEARCH_COST + 2 * MAX_ENRICH_CALLS)
+        return {
+            'total_quota': int(math.ceil(total)),
+            'low': int(max(floor, total - margin)),
+            'high': int(math.ceil(min(ceiling, total + margin))),
+            'search_quota': int(round(expected_pages * SEARCH_COST)),
+            'video_quota': int(math.ceil(expected_pages * self.video_calls_per_page)),
+            'channel_quota': int(math.ceil(expected_pages * self.channel_calls_per_page)),
+            'expected_pages': expected_pages,
+            'per_keyword': per_keyword,
+            'calibrated_runs': self.runs
+        }
+
+
+def estimate_quota(keywords, pages, estimator=None):
+    """Quota estimate for <keywords> x <pages>, shared by the GUI and the headless runner"""
+    return (estimator or QuotaEstimator()).estimate(keywords, pages)
@@ -0,0 +1,421 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from api_errors import QUOTA_REASONS, RATE_LIMIT_REASONS, KEY_REASONS
+from datetime import datetime, timedelta, timezone
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    from zoneinfo import ZoneInfo
+    PACIFIC = ZoneInfo('America/Los_Angeles')
+except Exception:  # no zoneinfo / tz database (e.g. Windows without tzdata)
+    PACIFIC = timezone(timedelta(hours=-8))
+
+DEFAULT_LEDGER_FILE = 'data/quota_ledger.json'
+DEFAULT_CALLS_LOG = 'logs/quota_calls.csv'
+DEFAULT_DAILY_QUOTA = 10000
+ENDPOINT_COSTS = {'search': 100, 'videos': 1, 'channels': 1}
+CALLS_LOG_COLUMNS = ['timestamp', 'quota_day', 'endpoint', 'units', 'outcome', 'pid']
+RATE_LIMIT_COOLDOWN = 60  # seconds a rate-limited key is skipped by the KeyPool
+LEDGER_FLUSH_CALLS = 25   # a ledger writes its pending calls to disk after this many ...
+LEDGER_FLUSH_SECONDS = 5  # ... or once this many seconds have passed since the last write
+LEDGER_DIRECT_UNITS = 100  # reservations this large (search.list) go to the ledger file at once
+
+
+class QuotaBudget:
+    """
+    Thread-safe quota counter shared by concurrent search workers.
+    Every API call reserves its cost up front, so the cap can never be
+    overshot no matter how many workers run at the same time.
+    """
+
+    def __init__(self, cap):
+        self.cap = int(cap or 0)  # 0 = unlimited
+        self.used = 0
+        self._lock = threading.Lock()
+
+    def try_reserve(self, units):
+        """Atomically reserve <units>; return False if that would exceed the cap"""
+        with self._lock:
+            if self.cap and self.used + units > self.cap:
+                return False
+            self.used += units
+            return True
+
+    def release(self, units):
+        """Give back <units> reserved for a call that was never made"""
+        with self._lock:
+            self.used = max(0, self.used - units)
+
+    def remaining(self):
+        """Units left before the cap (None when unlimited)"""
+        with self._lock:
+            return max(0, self.cap - self.used) if self.cap else None
+
+
+def quota_day(now=None):
+    """The YouTube quota day (YYYY-MM-DD) of <now>; quotas reset at midnight Pacific time"""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(PACIFIC).strftime('%Y-%m-%d')
+
+
+def call_outcome(status, data=None):
+    """
+    Outcome label of an API response: 'ok', 'not_modified' (304 to a conditional request),
+    the API error reason (e.g. quotaExceeded) or http_<status>
+    """
+    if status == 200:
+        return 'ok'
+    if status == 304:
+        return 'not_modified'
+    try:
+        return data['error']['errors'][0]['reason']
+    except (KeyError, IndexError, TypeError):
+        return f'http_{status}'
+
+
+class QuotaLedger:
+    """
+    Daily quota ledger shared by every process using the same API key.
+
+    Each API call reserves its cost before it is sent and is then recorded with
+    its endpoint and outcome. Totals for the current quota day (Pacific time)
+    live in a small JSON file that is updated under an exclusive file lock, so
+    the GUI, the headless runner and concurrent workers share daily_quota.
+    Every call is also appended to a CSV log.
+    Calls that never reached the API (network errors) are refunded; error
+    responses are still charged, as YouTube charges them too.
+
+    Reservations of LEDGER_DIRECT_UNITS or more (search.list) are added to the file
+    total under the lock as they are made, so other processes see them at once.
+    Cheap calls (videos.list / channels.list, 1 unit), outcomes and log rows are
+    counted in memory and merged into the file in batches (every LEDGER_FLUSH_CALLS
+    calls or LEDGER_FLUSH_SECONDS, and on flush()), so at most a few dozen units
+    are invisible to another process at any time.
+    """
+
+    def __init__(self, ledger_file=DEFAULT_LEDGER_FILE, calls_log=DEFAULT_CALLS_LOG,
+                 daily_quota=DEFAULT_DAILY_QUOTA):
+        self.ledger_file = ledger_file
+        self.calls_log = calls_log
+        self.daily_quota = int(daily_quota or 0)  # 0 = unlimited
+        self._lock = threading.Lock()
+        self._stamp = None  # (mtime_ns, size) of the ledger file when it was last read
+        self._state = self._empty_state()
+        self._pending = self._empty_pending()
+        self._last_flush = time.monotonic()
+
+    @staticmethod
+    def _empty_pending():
+        return {'used': 0, 'calls': 0, 'endpoints': {}, 'rows': []}
+
+    @staticmethod
+    def _empty_state(day=None):
+        return {'quota_day': day or quota_day(), 'used': 0, 'runs': 0, 'exhausted': False, 'endpoints': {}}
+
+    @contextmanager
+    def _locked(self):
+        """Hold the in-process lock and an exclusive lock on <ledger_file>.lock"""
+        with self._lock:
+            os.makedirs(os.path.dirname(self.ledger_file) or '.', exist_ok=True)
+            with open(f'{self.ledger_file}.lock', 'a+b') as lock_file:
+                if fcntl is not None:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                else:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                try:
+                    self._refresh()
+                    yield self._state
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+                    else:
+                        lock_file.seek(0)
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _refresh(self):
+        """Re-read the ledger file if another process changed it, and roll over to a new quota day"""
+        try:
+            stat = os.stat(self.ledger_file)
+            stamp = (stat.st_mtime_ns, stat.st_size)
+            if stamp != self._stamp:
+                with open(self.ledger_file, 'r', encoding='utf-8') as f:
+                    self._state = json.load(f)
+                self._stamp = stamp
+        except FileNotFoundError:
+            self._stamp = None
+        except Exception as e:
+            print(f"Warning: Failed to read quota ledger: {str(e)}")
+        today = quota_day()
+        if self._state.get('quota_day') != today:
+            self._state = self._empty_state(today)
+
+    def _save(self):
+        try:
+            tmp_file = f'{self.ledger_file}.tmp'
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self._state, f, indent=2)
+            os.replace(tmp_file, self.ledger_file)
+            stat = os.stat(self.ledger_file)
+            self._stamp = (stat.st_mtime_ns, stat.st_size)
+        except Exception as e:
+            print(f"Warning: Failed to save quota ledger: {str(e)}")
+
+    def try_reserve(self, endpoint, units=None):
+        """Reserve the cost of one <endpoint> call; return False if that would exceed daily_quota"""
+        units = ENDPOINT_COSTS.get(endpoint, 1) if units is None else units
+        if units >= LEDGER_DIRECT_UNITS:
+            with self._locked() as state:
+                if not self._has_room(state, units):
+                    return False
+                state['used'] += units
+                self._save()
+                return True
+        with self._lock:
+            self._refresh()
+            if not self._has_room(self._state, units):
+                return False
+            self._pending['used'] += units
+            return True
+
+    def _has_room(self, state, units):
+        """True if <units> more fit into daily_quota (the in-process lock must be held)"""
+        if state.get('exhausted'):
+            return False
+        return not self.daily_quota or state['used'] + self._pending['used'] + units <= self.daily_quota
+
+    def record(self, endpoint, outcome, units=None):
+        """
+        Record the outcome of a reserved <endpoint> call.
+        outcome 'network_error' (no response received) refunds the reservation.
+        """
+        units = ENDPOINT_COSTS.get(endpoint, 1) if units is None else units
+        charged = 0 if outcome == 'network_error' else units
+        with self._lock:
+            stats = self._pending['endpoints'].setdefault(endpoint, {'calls': 0, 'units': 0, 'outcomes': {}})
+            stats['calls'] += 1
+            stats['units'] += charged
+            stats['outcomes'][outcome] = stats['outcomes'].get(outcome, 0) + 1
+            self._pending['used'] -= units - charged
+            self._pending['calls'] += 1
+            self._pending['rows'].append([datetime.now().strftime('%Y-%m-%d %H:%M:%S'), self._state['quota_day'],
+                                          endpoint, charged, outcome, os.getpid()])
+            due = (self._pending['calls'] >= LEDGER_FLUSH_CALLS
+                   or time.monotonic() - self._last_flush >= LEDGER_FLUSH_SECONDS)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Merge the calls counted in memory into the ledger file and append them to the CSV log"""
+        with self._lock:
+            if not self._pending['calls'] and not self._pending['used']:
+                return
+        with self._locked():
+            self._merge_pending()
+            self._save()
+
+    def _merge_pending(self):
+        """Add the pending counts to the state read from disk (the file lock must be held)"""
+        pending, self._pending = self._pending, self._empty_pending()
+        self._last_flush = time.monotonic()
+        self._add_counts(self._state, pending)
+        self._log_calls(pending['rows'])
+
+    @staticmethod
+    def _add_counts(state, pending):
+        """Add pending units and per-endpoint counts to <state>"""
+        state['used'] = max(0, state['used'] + pending['used'])
+        for endpoint, counts in pending['endpoints'].items():
+            stats = state['endpoints'].setdefault(endpoint, {'calls': 0, 'units': 0, 'outcomes': {}})
+            stats['calls'] += counts['calls']
+            stats['units'] += counts['units']
+            for outcome, count in counts['outcomes'].items():
+                stats['outcomes'][outcome] = stats['outcomes'].get(outcome, 0) + count
+
+    def mark_exhausted(self):
+        """Refuse further calls until the next quota day (the API reported the key out of quota)"""
+        with self._locked() as state:
+            state['exhausted'] = True
+            self._merge_pending()
+            self._save()
+
+    def record_run(self):
+        """Count one finished search run for today"""
+        with self._locked() as state:
+            state['runs'] = state.get('runs', 0) + 1
+            self._merge_pending()
+            self._save()
+
+    def _log_calls(self, rows):
+        if not rows:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.calls_log) or '.', exist_ok=True)
+            is_new = not os.path.exists(self.calls_log)
+            with open(self.calls_log, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if is_new:
+                    writer.writerow(CALLS_LOG_COLUMNS)
+                writer.writerows(rows)
+        except Exception as e:
+            print(f"Warning: Failed to log API calls: {str(e)}")
+
+    def _current(self):
+        """Today's state including the calls not flushed yet; re-reads the file only if it changed"""
+        with self._lock:
+            self._refresh()
+            state = json.loads(json.dumps(self._state))
+            self._add_counts(state, self._pending)
+            return state
+
+    def used_today(self):
+        """Units spent (or reserved) today by this process and every flushed one"""
+        return self._current()['used']
+
+    def remaining_today(self):
+        """Units left today before daily_quota (None when unlimited)"""
+        state = self._current()
+        if state.get('exhausted'):
+            return 0
+        return max(0, self.daily_quota - state['used']) if self.daily_quota else None
+
+    def runs_today(self):
+        return self._current().get('runs', 0)
+
+    def endpoint_stats(self):
+        """{endpoint: {'calls', 'units', 'outcomes': {outcome: count}}} for today"""
+        return self._current()['endpoints']
+
+
+def ledger_file_for(api_key):
+    """Ledger file of one API key, named by a hash so the key itself is never written to disk"""
+    digest = hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:12]
+    return os.path.join(os.path.dirname(DEFAULT_LEDGER_FILE), f'quota_ledger_{digest}.json')
+
+
+def mask_key(api_key):
+    """Short form of an API key for log messages"""
+    return f'{api_key[:4]}...{api_key[-4:]}' if len(api_key) > 8 else '***'
+
+
+class KeyPool:
+    """
+    API keys, each with its own daily QuotaLedger.
+
+    acquire() reserves a call's cost on the available key with the most quota
+    left today, so concurrent workers drain all keys evenly. A key reported out
+    of quota is skipped until the next quota day (in every process, through its
+    ledger); a rate-limited key is skipped for RATE_LIMIT_COOLDOWN seconds and a
+    rejected (invalid) key for the rest of the run.
+    The totals methods answer for the whole pool.
+    """
+
+    def __init__(self, api_keys, daily_quota=DEFAULT_DAILY_QUOTA, calls_log=DEFAULT_CALLS_LOG):
+        if not api_keys:
+            raise ValueError("KeyPool needs at least one API key")
+        self.api_keys = list(api_keys)
+        self.ledgers = {key: QuotaLedger(ledger_file_for(key), calls_log, daily_quota) for key in self.api_keys}
+        self.daily_quota = int(daily_quota or 0)
+        self._cooldown_until = {}   # key -> time.monotonic() when it may be used again
+        self._turn = 0              # round-robin tie breaker
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, api_keys, settings):
+        """Create a pool for <api_keys> using the daily_quota setting (per key)"""
+        try:
+            daily_quota = int(settings.get('daily_quota', '') or DEFAULT_DAILY_QUOTA)
+        except (ValueError, TypeError):
+            daily_quota = DEFAULT_DAILY_QUOTA
+        return cls(api_keys, daily_quota)
+
+    def _available(self):
+        now = time.monotonic()
+        keys = [key for key in self.api_keys if self._cooldown_until.get(key, 0) <= now]
+        return keys or self.api_keys  # every key rate-limited: let the API decide
+
+    def acquire(self, endpoint, units=None):
+        """Reserve the cost of one <endpoint> call; return the API key to use, or None if no key has quota"""
+        with self._lock:
+            keys = self._available()
+            self._turn = (self._turn + 1) % len(self.api_keys)
+            # most quota left first; equal keys take turns
+            order = sorted(range(len(keys)), key=lambda i: (
+                -(self.ledgers[keys[i]].remaining_today() if self.daily_quota else 0),
+                (i - self._turn) % len(keys)))
+            for i in order:
+                if self.ledgers[keys[i]].try_reserve(endpoint, units):
+                    return keys[i]
+        return None
+
+    def record(self, api_key, endpoint, outcome, units=None):
+        """
+        Record a call made with <api_key> in its ledger.
+        Returns True if the key was taken out of rotation and another key may retry the call.
+        """
+        ledger = self.ledgers[api_key]
+        ledger.record(endpoint, outcome, units)
+        if outcome in QUOTA_REASONS:
+            ledger.mark_exhausted()
+            print(f"API key {mask_key(api_key)} is out of quota for today")
+        elif outcome in KEY_REASONS:
+            with self._lock:
+                self._cooldown_until[api_key] = float('inf')
+            print(f"API key {mask_key(api_key)} was rejected ({outcome}), not using it again")
+        elif outcome in RATE_LIMIT_REASONS:
+            with self._lock:
+                self._cooldown_until[api_key] = time.monotonic() + RATE_LIMIT_COOLDOWN
+            print(f"API key {mask_key(api_key)} is rate-limited, pausing it for {RATE_LIMIT_COOLDOWN}s")
+        else:
+            return False
+        return self._has_other_key(api_key)
+
+    def _has_other_key(self, api_key):
+        """True if a key other than <api_key> is neither rate-limited nor out of quota"""
+        now = time.monotonic()
+        with self._lock:
+            return any(key != api_key and self._cooldown_until.get(key, 0) <= now
+                       and self.ledgers[key].remaining_today() != 0 for key in self.api_keys)
+
+    def used_today(self):
+        return sum(ledger.used_today() for ledger in self.ledgers.values())
+
+    def remaining_today(self):
+        """Units left today over all keys (None when unlimited)"""
+        if not self.daily_quota:
+            return None
+        return sum(ledger.remaining_today() for ledger in self.ledgers.values())
+
+    def runs_today(self):
+        return sum(ledger.runs_today() for ledger in self.ledgers.values())
+
+    def record_run(self):
+        """Count one finished search run for today (kept in the first key's ledger)"""
+        self.ledgers[self.api_keys[0]].record_run()
+
+    def flush(self):
+        """Write every key's pending calls to its ledger file and the CSV log"""
+        for ledger in self.ledgers.values():
+            ledger.flush()
+
+    def endpoint_stats(self):
+        """{endpoint: {'calls', 'units', 'outcomes'}} for today, summed over all keys"""
+        totals = {}
+        for ledger in self.ledgers.values():
+            for endpoint, stats in ledger.endpoint_stats().items():
+                total = totals.setdefault(endpoint, {'calls': 0, 'units': 0, 'outcomes': {}})
+                total['calls'] += stats['calls']
+                total['units'] += stats['units']
+                for outcome, count in stats['outcomes'].items():
+                    total['outcomes'][outcome] = total['outcomes'].get(outcome, 0) + count
+        return totals
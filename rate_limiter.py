@@ -0,0 +1,87 @@
+import asyncio
+import threading
+import time
+
+DEFAULT_REQUESTS_PER_SECOND = 10
+DEFAULT_UNITS_PER_MINUTE = 0    # 0 = no per-minute quota limit
+
+
+def _setting_float(settings, name, default):
+    try:
+        return float(settings.get(name, '') or default)
+    except (ValueError, TypeError):
+        return default
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at <rate> tokens per second, holding at most <capacity>.
+    reserve() takes the tokens even when the bucket runs dry and returns how long
+    the caller has to wait for them, so waiting callers are served in arrival order.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take <tokens> (at most one full bucket); return the seconds to wait before using them"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= min(tokens, self.capacity)
+            return max(0.0, -self._tokens / self.rate)
+
+
+class RateLimiter:
+    """
+    Limits API calls to <requests_per_second> and quota to <units_per_minute>.
+
+    One limiter is shared by every endpoint, worker thread and asyncio task, so
+    a single worker runs at full speed while it stays under the limits and many
+    workers share the same budget. Callers wait only as long as the buckets need
+    to refill (backpressure), instead of sleeping a fixed delay after every call.
+    A limit of 0 disables that bucket.
+    """
+
+    def __init__(self, requests_per_second=DEFAULT_REQUESTS_PER_SECOND,
+                 units_per_minute=DEFAULT_UNITS_PER_MINUTE):
+        self.requests = TokenBucket(requests_per_second) if requests_per_second > 0 else None
+        self.units = TokenBucket(units_per_minute / 60, units_per_minute) if units_per_minute > 0 else None
+        self.waits = 0          # calls that had to wait
+        self.waited = 0.0       # seconds spent waiting in total
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create the limiter described by rate_limit_per_second / rate_limit_units_per_minute"""
+        return cls(_setting_float(settings, 'rate_limit_per_second', DEFAULT_REQUESTS_PER_SECOND),
+                   _setting_float(settings, 'rate_limit_units_per_minute', DEFAULT_UNITS_PER_MINUTE))
+
+    def _reserve(self, units):
+        wait = 0.0
+        if self.requests is not None:
+            wait = self.requests.reserve(1)
+        if self.units is not None:
+            wait = max(wait, self.units.reserve(units))
+        if wait:
+            with self._lock:
+                self.waits += 1
+                self.waited += wait
+        return wait
+
+    def acquire(self, units=1):
+        """Block until one call costing <units> quota units may be sent"""
+        wait = self._reserve(units)
+        if wait:
+            time.sleep(wait)
+
+    async def acquire_async(self, units=1):
+        """asyncio variant of acquire(): waits without blocking the event loop"""
+        wait = self._reserve(units)
+        if wait:
+            await asyncio.sleep(wait)
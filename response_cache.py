@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from urllib.parse import urlencode
+
+DEFAULT_CACHE_FILE = 'data/response_cache.json'
+DEFAULT_TTL_HOURS = 1
+DEFAULT_MAX_ENTRIES = 2000
+SEARCH_CACHE_FILE = 'data/search_cache.json'
+
+
+def cache_key(endpoint, params):
+    """
+    Stable key for an API call: endpoint plus its sorted parameters (the API key left out).
+    The order of IDs in 'id' does not matter, so the same batch in another order still hits.
+    """
+    items = []
+    for name, value in params.items():
+        if name == 'id':
+            value = ','.join(sorted(value.split(',')))
+        if name != 'key':
+            items.append((name, value))
+    query = urlencode(sorted(items))
+    return hashlib.sha1(f'{endpoint}?{query}'.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+    """
+    On-disk cache of API responses keyed by endpoint and parameters.
+    Each entry keeps the decoded JSON body, its ETag and when it was last fetched or revalidated.
+    Entries younger than the TTL are served without a request; older ones are
+    revalidated with If-None-Match, so an unchanged response comes back as a
+    bodyless 304 instead of being downloaded and parsed again.
+    Once the cache grows past max_entries or max_bytes (0 = no limit) the least
+    recently validated entries are evicted.
+    Items of videos.list / channels.list bodies can also be looked up one ID at a time
+    (lookup_items), whatever batch they were fetched in.
+    """
+
+    def __init__(self, cache_file=DEFAULT_CACHE_FILE, ttl_hours=DEFAULT_TTL_HOURS,
+                 max_entries=DEFAULT_MAX_ENTRIES, max_bytes=0):
+        self.cache_file = cache_file
+        self.ttl_seconds = float(ttl_hours) * 3600
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0           # served from the cache without a request
+        self.revalidated = 0    # answered 304 Not Modified
+        self.misses = 0         # fetched in full
+        self._entries = None    # loaded lazily
+        self._item_index = None  # (endpoint, part, item id) -> cache key, built lazily
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._entries is not None:
+            return
+        self._entries = {}
+        try:
+            if os.path.exists(self.cache_file):
+                with open(self.cache_file, 'r', encoding='utf-8') as f:
+                    self._entries = json.load(f)
+        except Exception as e:
+            print(f"Warning: Failed to load response cache: {str(e)}")
+
+    def lookup(self, endpoint, params, any_age=False):
+        """
+        Return (body, etag, fresh) for a call; (None, None, False) when it is not cached.
+        A fresh body (within the TTL, or of any age with <any_age>) can be used as-is;
+        otherwise the etag should be sent as If-None-Match and the body used if the API answers 304.
+        """
+        with self._lock:
+            self._load()
+            entry = self._entries.get(cache_key(endpoint, params))
+            if entry is None:
+                return None, None, False
+            fresh = any_age or time.time() - entry.get('fetched_at', 0) < self.ttl_seconds
+            if fresh:
+                self.hits += 1
+            return entry['body'], entry.get('etag'), fresh
+
+    def lookup_items(self, endpoint, params):
+        """
+        Return the cached items for the IDs in params['id'] (of any age), taken from
+        whichever cached responses contain them; IDs never fetched are left out.
+        """
+        with self._lock:
+            self._load()
+            if self._item_index is None:
+                self._item_index = {}
+                for key, entry in self._entries.items():
+                    for item in entry['body'].get('items', []):
+                        self._item_index[(entry.get('endpoint'), entry.get('part'), item.get('id'))] = key
+            items = []
+            for item_id in params.get('id', '').split(','):
+                key = (self._item_index.get((endpoint, params.get('part'), item_id))
+                       or self._item_index.get((endpoint, None, item_id)))  # stored before 'part' was kept
+                entry = self._entries.get(key)
+                if entry is None:
+                    continue
+                items.extend(item for item in entry['body'].get('items', []) if item.get('id') == item_id)
+            if items:
+                self.hits += 1
+            return items
+
+    def not_modified(self, endpoint, params):
+        """Mark a cached call as revalidated by a 304 response, restarting its TTL"""
+        with self._lock:
+            self._load()
+            self.revalidated += 1
+            entry = self._entries.get(cache_key(endpoint, params))
+            if entry is not None:
+                entry['fetched_at'] = time.time()
+                self._dirty = True
+
+    def store(self, endpoint, params, body, etag=None):
+        """Store a freshly fetched response body with its ETag"""
+        with self._lock:
+            self._load()
+            self._entries[cache_key(endpoint, params)] = {
+                'endpoint': endpoint,
+                'part': params.get('part'),
+                'etag': etag or body.get('etag'),
+                'body': body,
+                'size': len(json.dumps(body)),
+                'fetched_at': time.time()
+            }
+            self.misses += 1
+            self._evict()
+            self._item_index = None
+            self._dirty = True
+
+    def _evict(self):
+        """Drop the least recently validated entries beyond max_entries and max_bytes"""
+        total = sum(entry.get('size', 0) for entry in self._entries.values()) if self.max_bytes else 0
+        if not ((self.max_entries and len(self._entries) > self.max_entries)
+                or (self.max_bytes and total > self.max_bytes)):
+            return
+        for key in sorted(self._entries, key=lambda k: self._entries[k].get('fetched_at', 0)):
+            if ((not self.max_entries or len(self._entries) <= self.max_entries)
+                    and (not self.max_bytes or total <= self.max_bytes)):
+                break
+            total -= self._entries.pop(key).get('size', 0)
+
+    def save(self):
+        """Write the cache to disk if it changed (atomic replace)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+                tmp_file = f'{self.cache_file}.tmp'
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(self._entries, f)
+                os.replace(tmp_file, self.cache_file)
+                self._dirty = False
+            except Exception as e:
+                print(f"Warning: Failed to save response cache: {str(e)}")
+
+    def clear(self):
+        """Forget all cached responses"""
+        with self._lock:
+            self._entries = {}
+            self._item_index = None
+            self._dirty = True
@@ -0,0 +1,65 @@
+import threading
+import pandas as pd
+
+DEFAULT_FLUSH_SIZE = 50  # kept videos buffered before they are written out
+
+
+class ResultSink:
+    """
+    Streams kept videos to the daily results file, the seen-history and, with the
+    SQLite backend, its results table (the last two only with record_history, which
+    is off when re-filtering cached results).
+    Videos are buffered and written in small batches as they pass the filters,
+    so memory stays bounded and a crash or quota stop keeps everything
+    found so far. Call close() (or use it as a context manager) to write the rest
+    and the columnar copy of the results file, if output_format asks for one.
+    """
+
+    def __init__(self, csv_handler, results_file, flush_size=DEFAULT_FLUSH_SIZE, dedupe=False,
+                 record_history=True):
+        self.csv_handler = csv_handler
+        self.results_file = results_file
+        self.flush_size = max(1, flush_size)
+        self.dedupe = dedupe
+        self.record_history = record_history
+        self.count = 0          # videos written so far
+        self._pending = []
+        self._closed = False
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add(self, videos):
+        """Buffer kept videos, writing them once flush_size are pending"""
+        with self._lock:
+            self._pending.extend(videos)
+            if len(self._pending) >= self.flush_size:
+                self._flush()
+
+    def flush(self):
+        """Write every buffered video"""
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._flush()
+        if self.count:
+            self.csv_handler.export_columnar(self.results_file)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        videos, self._pending = self._pending, []
+        self.csv_handler.save_results(pd.DataFrame(videos), self.results_file,
+                                      dedupe=self.dedupe, quiet=True, store=self.record_history)
+        if self.record_history:
+            self.csv_handler.update_history([video['video_id'] for video in videos], quiet=True)
+        self.count += len(videos)
@@ -0,0 +1,191 @@
+import sqlite3
+import threading
+import pandas as pd
+
+DEFAULT_DB_FILE = 'data/youtube_finder.db'
+
+KEYWORD_STATS_COLUMNS = [
+    'run_timestamp', 'keyword', 'pages_fetched', 'quota_used', 'seen', 'duration', 'views',
+    'timeframe', 'upload_date', 'hidden_subs', 'subscribers', 'kept', 'pages_requested', 'completed'
+]
+
+RESULT_COLUMNS = [
+    'title', 'description', 'tags', 'video_url', 'video_id',
+    'channel_title', 'channel_id', 'subscriber_count', 'view_count',
+    'comments', 'likes', 'duration_minutes', 'published_at', 'keyword'
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS history (
+    video_id        TEXT PRIMARY KEY,
+    first_seen_date TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_first_seen ON history (first_seen_date);
+
+CREATE TABLE IF NOT EXISTS results (
+    id               INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_date         TEXT NOT NULL,
+    title            TEXT,
+    description      TEXT,
+    tags             TEXT,
+    video_url        TEXT,
+    video_id         TEXT NOT NULL,
+    channel_title    TEXT,
+    channel_id       TEXT,
+    subscriber_count INTEGER,
+    view_count       INTEGER,
+    comments         INTEGER,
+    likes            INTEGER,
+    duration_minutes REAL,
+    published_at     TEXT,
+    keyword          TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_video_id ON results (video_id);
+CREATE INDEX IF NOT EXISTS idx_results_keyword ON results (keyword);
+CREATE INDEX IF NOT EXISTS idx_results_published_at ON results (published_at);
+CREATE INDEX IF NOT EXISTS idx_results_run_date ON results (run_date);
+
+CREATE TABLE IF NOT EXISTS runs (
+    id             INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_timestamp  TEXT NOT NULL,
+    quota_used     INTEGER,
+    keywords_count INTEGER,
+    results_count  INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_runs_timestamp ON runs (run_timestamp);
+
+CREATE TABLE IF NOT EXISTS keyword_stats (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_timestamp TEXT NOT NULL,
+    keyword       TEXT NOT NULL,
+    pages_fetched INTEGER,
+    quota_used    INTEGER,
+    seen          INTEGER,
+    duration      INTEGER,
+    views         INTEGER,
+    timeframe     INTEGER,
+    upload_date   INTEGER,
+    hidden_subs   INTEGER,
+    subscribers   INTEGER,
+    kept          INTEGER,
+    pages_requested INTEGER,
+    completed     INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_keyword_stats_keyword ON keyword_stats (keyword);
+"""
+
+
+class SQLiteStore:
+    """
+    SQLite storage for seen-history, search results and run logs.
+    Used by CSVHandler when settings 'storage_backend' is 'sqlite'.
+    All writes are bulk inserts inside a single transaction.
+    """
+
+    def __init__(self, db_file=DEFAULT_DB_FILE):
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.executescript(SCHEMA)
+        # databases created before pages_requested / completed were logged
+        columns = {row[1] for row in self.conn.execute('PRAGMA table_info(keyword_stats)')}
+        for column in ('pages_requested', 'completed'):
+            if column not in columns:
+                self.conn.execute(f'ALTER TABLE keyword_stats ADD COLUMN {column} INTEGER')
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    # ---- history ---------------------------------------------------------
+
+    def load_history_ids(self):
+        """Return the set of all seen video IDs"""
+        with self._lock:
+            return {row[0] for row in self.conn.execute('SELECT video_id FROM history')}
+
+    def add_history(self, rows):
+        """Bulk insert (video_id, first_seen_date) rows, keeping the first_seen_date of known IDs"""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                'INSERT OR IGNORE INTO history (video_id, first_seen_date) VALUES (?, ?)', rows)
+
+    def history_count(self):
+        with self._lock:
+            return self.conn.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+    def delete_history_before(self, cutoff_date):
+        """Delete history entries first seen before <cutoff_date> (YYYY-MM-DD)"""
+        with self._lock, self.conn:
+            return self.conn.execute('DELETE FROM history WHERE first_seen_date < ?',
+                                     (cutoff_date,)).rowcount
+
+    def clear_history(self):
+        with self._lock, self.conn:
+            self.conn.execute('DELETE FROM history')
+
+    def history_stats(self):
+        with self._lock:
+            total, oldest, newest = self.conn.execute(
+                'SELECT COUNT(*), MIN(first_seen_date), MAX(first_seen_date) FROM history').fetchone()
+        return {'total_videos': total, 'oldest_date': oldest, 'newest_date': newest}
+
+    # ---- results ---------------------------------------------------------
+
+    def insert_results(self, results_df, run_date):
+        """Bulk insert result rows (columns as in RESULT_COLUMNS) for <run_date>"""
+        df = results_df.reindex(columns=RESULT_COLUMNS)
+        df = df.astype(object).where(pd.notna(df), None)
+        placeholders = ', '.join('?' for _ in range(len(RESULT_COLUMNS) + 1))
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f'INSERT INTO results (run_date, {", ".join(RESULT_COLUMNS)}) VALUES ({placeholders})',
+                [(run_date, *row) for row in df.itertuples(index=False, name=None)])
+
+    def query_results(self, run_date=None, keyword=None, published_after=None):
+        """Return results as a DataFrame, optionally filtered by run date, keyword and publish date"""
+        clauses = []
+        params = []
+        if run_date:
+            clauses.append('run_date = ?')
+            params.append(run_date)
+        if keyword:
+            clauses.append('keyword = ?')
+            params.append(keyword)
+        if published_after:
+            clauses.append('published_at >= ?')
+            params.append(published_after)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ''
+        with self._lock:
+            return pd.read_sql_query(f'SELECT {", ".join(RESULT_COLUMNS)} FROM results{where} ORDER BY id',
+                                     self.conn, params=params)
+
+    # ---- runs ------------------------------------------------------------
+
+    def insert_run(self, run_timestamp, quota_used, keywords_count, results_count):
+        with self._lock, self.conn:
+            self.conn.execute(
+                'INSERT INTO runs (run_timestamp, quota_used, keywords_count, results_count) VALUES (?, ?, ?, ?)',
+                (run_timestamp, quota_used, keywords_count, results_count))
+
+    def insert_keyword_stats(self, rows):
+        """Bulk insert per-keyword funnel rows (tuples in KEYWORD_STATS_COLUMNS order)"""
+        placeholders = ', '.join('?' for _ in KEYWORD_STATS_COLUMNS)
+        with self._lock, self.conn:
+            self.conn.executemany(
+                f'INSERT INTO keyword_stats ({", ".join(KEYWORD_STATS_COLUMNS)}) VALUES ({placeholders})', rows)
+
+    def keyword_history(self):
+        """Return {keyword: (kept, scanned)} summed over all logged runs"""
+        with self._lock:
+            rows = self.conn.execute(
+                'SELECT keyword, SUM(kept), SUM(seen + duration + views + timeframe + upload_date'
+                ' + hidden_subs + subscribers + kept) FROM keyword_stats GROUP BY keyword').fetchall()
+        return {keyword: (kept, scanned) for keyword, kept, scanned in rows}
+
+    def keyword_pages(self):
+        """Return (run_timestamp, keyword, pages_fetched, pages_requested, completed) for every logged keyword search"""
+        with self._lock:
+            return self.conn.execute('SELECT run_timestamp, keyword, pages_fetched, pages_requested, completed'
+                                     ' FROM keyword_stats').fetchall()
@@ -1,6 +1,7 @@
 import re
 import isodate
 from datetime import datetime, timedelta
+from quota_estimator import estimate_quota
 
 def format_duration(minutes):
     """Format duration in minutes to human readable format"""
@@ -141,39 +142,24 @@ def clean_text_for_csv(text):
     
     return text.strip()
 
-def estimate_search_quota(keywords_count, pages_per_keyword=2, videos_per_page=50):
-    """Estimate quota usage for a search operation"""
+def estimate_search_quota(keywords_count, pages_per_keyword=2, videos_per_page=50, estimator=None):
+    """
+    Estimate quota usage for a search operation.
+    Uses a calibrated quota_estimator.QuotaEstimator when given (uncalibrated: every page fetched)
+    """
     try:
-        # search.list: 100 units per call
-        search_calls = keywords_count * pages_per_keyword
-        search_quota = search_calls * 100
-        
-        # Estimate number of videos found
-        estimated_videos = search_calls * videos_per_page * 0.8  # Assume 80% success rate
-        
-        # videos.list: 1 unit per call (batches of 50)
-        video_calls = max(1, int(estimated_videos / 50))
-        video_quota = video_calls * 1
-        
-        # channels.list: 1 unit per call (batches of 50, same as videos)
-        channel_quota = video_calls * 1
-        
-        total_quota = search_quota + video_quota + channel_quota
-        
-        return {
-            'search_quota': search_quota,
-            'video_quota': video_quota,
-            'channel_quota': channel_quota,
-            'total_quota': total_quota,
-            'estimated_videos': int(estimated_videos)
-        }
-        
+        estimate = estimate_quota([''] * keywords_count, pages_per_keyword, estimator)
+        estimate['estimated_videos'] = int(estimate['expected_pages'] * videos_per_page)
+        return estimate
+
     except Exception:
         return {
             'search_quota': 0,
             'video_quota': 0,
             'channel_quota': 0,
             'total_quota': 0,
+            'low': 0,
+            'high': 0,
             'estimated_videos': 0
         }
 
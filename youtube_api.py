@@ -1,89 +1,444 @@
 import requests
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 import isodate
+from requests.adapters import HTTPAdapter
+from channel_cache import ChannelCache, DEFAULT_TTL_HOURS, DEFAULT_MAX_ENTRIES
+from response_cache import (ResponseCache, SEARCH_CACHE_FILE, DEFAULT_TTL_HOURS as RESPONSE_TTL_HOURS,
+                            DEFAULT_MAX_ENTRIES as RESPONSE_MAX_ENTRIES)
+from api_errors import (FATAL_ERRORS, QuotaExceededError, RetryPolicy, YouTubeAPIError, api_error,
+                        error_message, retry_after_seconds)
+from quota_manager import ENDPOINT_COSTS, call_outcome
+from rate_limiter import RateLimiter
 from utils import parse_duration_minutes
 
-class YouTubeSearcher:
-    def __init__(self, api_key):
+DEFAULT_POOL_SIZE = 10      # connection pools kept (one per host)
+DEFAULT_MAX_PER_HOST = 10   # open connections kept per host
+DEFAULT_TIMEOUT = 30        # seconds
+DEFAULT_BASE_URL = 'https://www.googleapis.com/youtube/v3'
+DEFAULT_SEARCH_CACHE_MB = 50
+PAGE_ENRICH_UNITS = 2       # at most one videos.list and one channels.list call per 50-result page
+
+
+def setting_int(settings, name, default):
+    """Read an integer option from settings, falling back to <default> when blank or invalid"""
+    try:
+        return int(settings.get(name, '') or default)
+    except (ValueError, TypeError):
+        return default
+
+
+def create_session(pool_size=DEFAULT_POOL_SIZE, max_per_host=DEFAULT_MAX_PER_HOST, keep_alive=True):
+    """
+    Build a requests.Session with a connection-pooled adapter.
+    Connections to googleapis.com are kept alive and reused between calls,
+    so a search page no longer costs a fresh TLS handshake per request.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size,
+                          pool_maxsize=max_per_host,
+                          pool_block=True)  # wait for a free connection instead of opening extras
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    return session
+
+
+def create_channel_cache(settings):
+    """Build the ChannelCache described by settings (None when channel_cache_ttl_hours is 0)"""
+    ttl_hours = setting_int(settings, 'channel_cache_ttl_hours', DEFAULT_TTL_HOURS)
+    if ttl_hours <= 0:
+        return None
+    return ChannelCache(ttl_hours=ttl_hours,
+                        max_entries=setting_int(settings, 'channel_cache_max_entries', DEFAULT_MAX_ENTRIES))
+
+
+def create_response_cache(settings):
+    """Build the ResponseCache described by settings (None when response_cache_max_entries is 0)"""
+    max_entries = setting_int(settings, 'response_cache_max_entries', RESPONSE_MAX_ENTRIES)
+    if max_entries <= 0:
+        return None
+    try:
+        ttl_hours = float(settings.get('response_cache_ttl_hours', '') or RESPONSE_TTL_HOURS)
+    except (ValueError, TypeError):
+        ttl_hours = RESPONSE_TTL_HOURS
+    return ResponseCache(ttl_hours=ttl_hours, max_entries=max_entries)
+
+
+def create_search_cache(settings):
+    """Build the cache of raw search.list pages described by settings (None when search_cache_max_mb is 0)"""
+    try:
+        max_mb = float(settings.get('search_cache_max_mb', '') or DEFAULT_SEARCH_CACHE_MB)
+        ttl_hours = float(settings.get('search_cache_ttl_hours', '') or RESPONSE_TTL_HOURS)
+    except (ValueError, TypeError):
+        max_mb, ttl_hours = DEFAULT_SEARCH_CACHE_MB, RESPONSE_TTL_HOURS
+    if max_mb <= 0:
+        return None
+    return ResponseCache(SEARCH_CACHE_FILE, ttl_hours=ttl_hours, max_entries=0,
+                         max_bytes=int(max_mb * 1024 * 1024))
+
+
+class SearcherHelpers:
+    """
+    Request building, response parsing, quota and cache helpers shared by
+    YouTubeSearcher and youtube_api_async.AsyncYouTubeSearcher.
+    Expects api_key, quota_budget, key_pool, search_cache, response_cache,
+    cache_only and stopped_by_quota attributes on the searcher.
+    """
+
+    def _reserve_quota(self, endpoint, units):
+        """
+        Reserve units from the shared quota budget and the key pool.
+        Returns the API key to call with, or None when the budget or every key is out of quota.
+        """
+        if self.quota_budget is not None and not self.quota_budget.try_reserve(units):
+            return None
+        if self.key_pool is None:
+            return self.api_key
+        api_key = self.key_pool.acquire(endpoint, units)
+        if api_key is None and self.quota_budget is not None:
+            self.quota_budget.release(units)
+        return api_key
+
+    def _release_quota(self, units):
+        """Give back budget reserved for a try that never reached the API (the ledger refunds it too)"""
+        if self.quota_budget is not None:
+            self.quota_budget.release(units)
+
+    def _retry_key(self, endpoint, error):
+        """Reserve quota to repeat a failed call; raise <error> if there is none left"""
+        api_key = self._reserve_quota(endpoint, ENDPOINT_COSTS[endpoint])
+        if api_key is None:
+            self.stopped_by_quota = True
+            raise error
+        return api_key
+
+    def _record_call(self, api_key, endpoint, outcome):
+        """Record a call in the key pool; return True if it should be repeated with another key"""
+        if self.key_pool is None:
+            return False
+        return self.key_pool.record(api_key, endpoint, outcome)
+
+    def _cache_for(self, endpoint):
+        """The cache holding <endpoint> responses: search_cache for search.list, else response_cache"""
+        return self.search_cache if endpoint == 'search' else self.response_cache
+
+    def _cache_lookup(self, endpoint, params):
+        """
+        (body, etag, fresh) for a call from its cache; in cache_only mode any cached body is fresh,
+        and a videos/channels batch never fetched as such is assembled from the cached items per ID
+        """
+        cache = self._cache_for(endpoint)
+        if cache is None:
+            return None, None, False
+        body, etag, fresh = cache.lookup(endpoint, params, any_age=self.cache_only)
+        if body is None and self.cache_only and 'id' in params:
+            items = cache.lookup_items(endpoint, params)
+            if items:
+                return {'items': items}, None, True
+        return body, etag, fresh
+
+    def _build_search_params(self, query, page_token, region, language,
+                             duration_param, published_after, published_before):
+        """Build the search.list query parameters for one page"""
+        params = {
+            'part': 'snippet',
+            'q': query,
+            'type': 'video',
+            'order': 'viewCount',
+            'maxResults': 50
+        }
+
+        if page_token:
+            params['pageToken'] = page_token
+        if region:
+            params['regionCode'] = region
+        if language:
+            params['relevanceLanguage'] = language
+        if duration_param:
+            params['videoDuration'] = duration_param
+        if published_after:
+            params['publishedAfter'] = published_after
+        if published_before:
+            params['publishedBefore'] = published_before
+        return params
+
+    def _parse_channel_item(self, item):
+        """Parse a channel item from the API response into (channel_id, info dict)"""
+        statistics = item.get('statistics', {})
+        return item['id'], {
+            'subscriber_count': int(statistics.get('subscriberCount', 0)),
+            'hidden_subscriber_count': statistics.get('hiddenSubscriberCount', False)
+        }
+
+    def _parse_video_item(self, item):
+        """Parse a video item from the API response and return a dict."""
+        try:
+            video_id = item['id']
+            snippet = item['snippet']
+            statistics = item.get('statistics', {})
+            content_details = item.get('contentDetails', {})
+
+            # Parse duration
+            duration_iso = content_details.get('duration', 'PT0S')
+            duration_minutes = parse_duration_minutes(duration_iso)
+
+            # Build the dict
+            video_data = {
+                'video_id': video_id,
+                'video_url': f'https://www.youtube.com/watch?v={video_id}',
+                'title': snippet.get('title', ''),
+                'description': snippet.get('description', ''),
+                'tags': ','.join(snippet.get('tags', [])),
+                'channel_title': snippet.get('channelTitle', ''),
+                'channel_id': snippet.get('channelId', ''),
+                'published_at': snippet.get('publishedAt', ''),
+                'view_count': int(statistics.get('viewCount', 0)),
+                'comments': int(statistics.get('commentCount', 0)),   # NEW
+                'likes': int(statistics.get('likeCount', 0)),
+                'duration': duration_iso,
+                'duration_minutes': duration_minutes,
+                'subscriber_count': 0,
+                'hidden_subscriber_count': False
+            }
+            return video_data
+
+        except Exception as e:
+            print(f"Skipping malformed video item: {e}")
+            return None   # caller ignores None
+
+    def _get_duration_param(self, duration_filter):
+        """Convert duration filter to API parameter"""
+        if duration_filter == 'Short (<4 min)':
+            return 'short'
+        elif duration_filter == 'Medium (4-20 min)':
+            return 'medium'
+        elif duration_filter == 'Long (>20 min)':
+            return 'long'
+        else:
+            return None  # 'Any' or 'Custom' - no API filter
+
+
+class YouTubeSearcher(SearcherHelpers):
+    def __init__(self, api_key, session=None, timeout=DEFAULT_TIMEOUT,
+                 pool_size=DEFAULT_POOL_SIZE, max_per_host=DEFAULT_MAX_PER_HOST,
+                 keep_alive=True, quota_budget=None, rate_limiter=None, retry_policy=None):
         self.api_key = api_key
-        self.base_url = 'https://www.googleapis.com/youtube/v3'
+        self.base_url = DEFAULT_BASE_URL
         self.quota_used = 0
-        self.rate_limit_delay = 0.1  # Small delay between requests
-        
-    def search_videos(self, query, max_pages=2, region='', language='',
-                      duration_filter='Any', quota_limit=10000,
-                      published_after='', published_before=''):
+        self.rate_limiter = rate_limiter or RateLimiter()  # shared by clones, so workers share the limits
+        self.retry_policy = retry_policy or RetryPolicy()  # backoff for transient errors, budget shared by clones
+        self.timeout = timeout
+        self.session = session or create_session(pool_size, max_per_host, keep_alive)
+        self.quota_budget = quota_budget  # optional QuotaBudget shared between workers
+        self.key_pool = None  # optional KeyPool: API keys with their daily quota ledgers
+        self.pipelined = False  # overlap the next search page with enrichment of the current one
+        self.channel_cache = None  # optional ChannelCache consulted before channels.list
+        self.response_cache = None  # optional ResponseCache for videos.list / channels.list responses
+        self.search_cache = None    # optional ResponseCache for search.list pages
+        self.cache_only = False     # re-filter mode: serve everything from the caches, never call the API
+        self.seen_filter = None    # optional callable(video_id) -> True if already seen
+        self.seen_skipped = 0      # already-seen hits dropped before enrichment by the last search
+        self.stopped_by_quota = False  # True if the last search ended because quota ran out
+        self.search_failed = False     # True if a call of the last search failed (after its retries)
+        self.pages_fetched = 0         # search pages returned by the last search
+        self._quota_lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, api_key, settings):
+        """Create a searcher using the http_* options from settings.json"""
+        searcher = cls(api_key,
+                       timeout=setting_int(settings, 'http_timeout', DEFAULT_TIMEOUT),
+                       pool_size=setting_int(settings, 'http_pool_size', DEFAULT_POOL_SIZE),
+                       max_per_host=setting_int(settings, 'http_max_per_host', DEFAULT_MAX_PER_HOST),
+                       keep_alive=settings.get('http_keep_alive', True))
+        # api_base_url lets the app run against a local mock server (mock_youtube_server.py)
+        searcher.base_url = settings.get('api_base_url', '') or DEFAULT_BASE_URL
+        searcher.pipelined = bool(settings.get('pipeline_pages', False))
+        searcher.channel_cache = create_channel_cache(settings)
+        searcher.response_cache = create_response_cache(settings)
+        searcher.search_cache = create_search_cache(settings)
+        searcher.rate_limiter = RateLimiter.from_settings(settings)
+        searcher.retry_policy = RetryPolicy.from_settings(settings)
+        return searcher
+
+    def clone(self, quota_budget=None):
         """
-        Search for videos using the YouTube API
-        Returns list of video dictionaries with complete metadata
-        Accepts optional RFC-3339 date strings 'published_after' and 'published_before'
+        Return a new searcher for another worker thread.
+        It shares the API key and pooled session but keeps its own quota_used counter.
         """
-        all_videos = []
-        page_token = None
-        pages_fetched = 0
-        self.quota_used = 0
+        worker = YouTubeSearcher(self.api_key, session=self.session, timeout=self.timeout,
+                                 quota_budget=quota_budget or self.quota_budget,
+                                 rate_limiter=self.rate_limiter, retry_policy=self.retry_policy)
+        worker.base_url = self.base_url
+        worker.key_pool = self.key_pool
+        worker.pipelined = self.pipelined
+        worker.channel_cache = self.channel_cache
+        worker.response_cache = self.response_cache
+        worker.search_cache = self.search_cache
+        worker.cache_only = self.cache_only
+        worker.seen_filter = self.seen_filter
+        return worker
 
-        # Map duration filter to API parameter
-        duration_param = self._get_duration_param(duration_filter)
+    @property
+    def completed(self):
+        """True if the last search ended normally, not cut short by quota or a failed call"""
+        return not (self.stopped_by_quota or self.search_failed)
+
+    def _drop_seen(self, video_ids):
+        """Remove already-seen video IDs (per seen_filter) so they are never enriched"""
+        if self.seen_filter is None:
+            return video_ids
+        unseen = [video_id for video_id in video_ids if not self.seen_filter(video_id)]
+        self.seen_skipped += len(video_ids) - len(unseen)
+        return unseen
 
-        while pages_fetched < max_pages and (not quota_limit or self.quota_used < quota_limit):
-            # Check if we have enough quota for this request
-            if quota_limit and (self.quota_used + 100) > quota_limit:
-                print(f"Quota limit would be exceeded, stopping search")
-                break
+    def _add_quota(self, units):
+        """Count units spent by this searcher (thread-safe for pipelined fetches)"""
+        with self._quota_lock:
+            self.quota_used += units
 
+    def _get(self, endpoint, params, api_key, headers=None):
+        """
+        GET an API endpoint through the pooled session with <api_key> and return the 200
+        response (or 304 Not Modified for a conditional request with <headers>).
+        Every try is recorded in the key's ledger and, once it got a response, counted in
+        quota_used (a network error's reservation is released). When the key pool takes the key out of
+        rotation (out of quota or rate-limited) the call is repeated with the next key, and
+        transient failures are retried with jittered backoff per retry_policy.
+        Other failures raise an api_errors exception (requests.RequestException for network errors).
+        """
+        attempt = 0
+        while True:
+            attempt += 1
+            self.rate_limiter.acquire(ENDPOINT_COSTS[endpoint])
+            retry_after = None
             try:
-                # Build search parameters
-                params = {
-                    'part': 'snippet',
-                    'q': query,
-                    'type': 'video',
-                    'order': 'viewCount',
-                    'maxResults': 50,
-                    'key': self.api_key
-                }
+                response = self.session.get(f'{self.base_url}/{endpoint}', params=dict(params, key=api_key),
+                                            headers=headers, timeout=self.timeout)
+            except requests.RequestException as e:
+                self._record_call(api_key, endpoint, 'network_error')
+                self._release_quota(ENDPOINT_COSTS[endpoint])
+                error, outcome = e, 'network_error'
+            else:
+                self._add_quota(ENDPOINT_COSTS[endpoint])
+                if response.status_code in (200, 304):
+                    self._record_call(api_key, endpoint, call_outcome(response.status_code))
+                    return response
+                data = None
+                try:
+                    data = response.json()
+                except ValueError:
+                    pass
+                outcome = call_outcome(response.status_code, data)
+                error = api_error(response.status_code, outcome, error_message(data) or response.text[:200])
+                retry_after = retry_after_seconds(response.headers)
+                if self._record_call(api_key, endpoint, outcome):
+                    api_key = self._retry_key(endpoint, error)
+                    continue
 
-                if page_token:
-                    params['pageToken'] = page_token
-                if region:
-                    params['regionCode'] = region
-                if language:
-                    params['relevanceLanguage'] = language
-                if duration_param:
-                    params['videoDuration'] = duration_param
-                if published_after:
-                    params['publishedAfter'] = published_after
-                if published_before:
-                    params['publishedBefore'] = published_before
-
-                # Make search request
-                response = requests.get(f'{self.base_url}/search', params=params)
-                time.sleep(self.rate_limit_delay)
-
-                if response.status_code != 200:
-                    print(f"Search API error: {response.status_code} - {response.text}")
-                    break
+            if not getattr(error, 'transient', True):
+                if isinstance(error, QuotaExceededError):
+                    self.stopped_by_quota = True
+                raise error
+            delay = self.retry_policy.next_delay(attempt, retry_after)
+            if delay is None:
+                raise error
+            print(f"{endpoint}.list failed ({outcome}), retrying in {delay:.1f}s")
+            time.sleep(delay)
+            api_key = self._retry_key(endpoint, error)
 
-                data = response.json()
-                self.quota_used += 100  # search.list costs 100 units
+    def _get_cached(self, endpoint, params):
+        """
+        Return the JSON body of an <endpoint> call, served from its cache when possible:
+        fresh entries cost no request, stale ones are revalidated with their ETag.
+        Returns None when quota does not allow the call, and an empty body for
+        an uncached call in cache_only mode.
+        """
+        body, etag, fresh = self._cache_lookup(endpoint, params)
+        if fresh:
+            return body
+        if self.cache_only:
+            return {}
+        api_key = self._reserve_quota(endpoint, ENDPOINT_COSTS[endpoint])
+        if not api_key:
+            self.stopped_by_quota = True
+            return None
+        return self._fetch(endpoint, params, api_key, body, etag)
 
-                if 'items' not in data or not data['items']:
-                    break
+    def _fetch(self, endpoint, params, api_key, cached_body=None, etag=None):
+        """
+        Make one <endpoint> call with the already reserved <api_key>, store the response
+        in its cache and return the JSON. With the <etag> of a cached body the call is
+        conditional and <cached_body> is returned on 304 Not Modified.
+        """
+        response = self._get(endpoint, params, api_key, {'If-None-Match': etag} if etag else None)
+        cache = self._cache_for(endpoint)
+        if response.status_code == 304:
+            cache.not_modified(endpoint, params)
+            return cached_body
+        body = response.json()
+        if cache is not None:
+            cache.store(endpoint, params, body, response.headers.get('ETag'))
+        return body
 
-                # Extract video IDs
-                video_ids = [item['id']['videoId'] for item in data['items']]
+    def get_connection_stats(self):
+        """Return how many HTTP connections were opened vs reused by this searcher"""
+        opened = 0
+        requests_made = 0
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                opened += pool.num_connections
+                requests_made += pool.num_requests
+        return {
+            'requests': requests_made,
+            'connections_opened': opened,
+            'connections_reused': max(0, requests_made - opened)
+        }
 
+    def close(self):
+        """Close pooled connections and persist the channel, response and search caches"""
+        for cache in (self.channel_cache, self.response_cache, self.search_cache):
+            if cache is not None:
+                cache.save()
+        self.session.close()
+        
+    def search_videos(self, query, max_pages=2, region='', language='',
+                      duration_filter='Any', quota_limit=10000,
+                      published_after='', published_before='', pipelined=None,
+                      start_page_token=None, on_page=None):
+        """
+        Search for videos using the YouTube API
+        Returns list of video dictionaries with complete metadata
+        Accepts optional RFC-3339 date strings 'published_after' and 'published_before'
+        Videos rejected by seen_filter are dropped before enrichment and counted in seen_skipped
+        With pipelined=True (default: self.pipelined) the next search page is requested as soon
+        as its nextPageToken is known, while the current page is still being enriched
+        Paging starts at 'start_page_token' when given (e.g. from a checkpoint)
+        on_page(page_videos, next_page_token) is called after every page; returning False
+        stops the search (a page already prefetched when pipelined is still paid for)
+        """
+        all_videos = []
+
+        def enrich_page(data, page_token):
+            # Extract video IDs, dropping already-seen ones before enrichment
+            video_ids = self._drop_seen([item['id']['videoId'] for item in data['items']])
+            video_details = []
+            if video_ids:
                 # Get detailed video information
                 video_details = self._get_video_details(video_ids, quota_limit - self.quota_used)
                 if not video_details:
-                    break
+                    return False
 
                 # Get channel information for subscriber counts
                 channel_ids = list(set([video['channel_id'] for video in video_details]))
                 channel_info = self._get_channel_details(channel_ids, quota_limit - self.quota_used)
 
-                # Merge channel info with video details
                 # Merge channel info with video details
                 for video in video_details:
                     channel_data = channel_info.get(video['channel_id'], {})
@@ -91,22 +446,129 @@ class YouTubeSearcher:
 
                 all_videos.extend(video_details)
 
-                # Get next page token
+            return on_page is None or on_page(video_details, page_token) is not False
+
+        self._page_through(query, max_pages, region, language, duration_filter, quota_limit,
+                           published_after, published_before, enrich_page,
+                           self.pipelined if pipelined is None else pipelined, start_page_token)
+        return all_videos
+
+    def search_video_ids(self, query, max_pages=2, region='', language='',
+                         duration_filter='Any', quota_limit=10000,
+                         published_after='', published_before=''):
+        """
+        Page through search.list only and return the video IDs found, in result order.
+        Used with enrichment.BatchEnricher, which fetches details for many keywords at once
+        """
+        video_ids = []
+
+        def collect_ids(data, page_token):
+            video_ids.extend(self._drop_seen([item['id']['videoId'] for item in data['items']]))
+            return True
+
+        self._page_through(query, max_pages, region, language, duration_filter, quota_limit,
+                           published_after, published_before, collect_ids)
+        return video_ids
+
+    def _page_through(self, query, max_pages, region, language, duration_filter, quota_limit,
+                      published_after, published_before, handle_page, pipelined=False,
+                      start_page_token=None):
+        """
+        Page through search.list for one query, calling handle_page(data, next_page_token)
+        for every non-empty page until it returns False, max_pages is reached or quota runs out.
+        Resets the per-search counters (quota_used, pages_fetched, seen_skipped, stopped_by_quota,
+        search_failed). When pipelined, the next page is requested before handle_page runs.
+        API errors other than FATAL_ERRORS end the search with a message and set search_failed.
+        """
+        self.pages_fetched = 0
+        self.quota_used = 0
+        self.seen_skipped = 0
+        self.stopped_by_quota = False
+        self.search_failed = False
+
+        # Map duration filter to API parameter
+        duration_param = self._get_duration_param(duration_filter)
+
+        def page_params(page_token):
+            return self._build_search_params(query, page_token, region, language,
+                                             duration_param, published_after, published_before)
+
+        executor = ThreadPoolExecutor(max_workers=1) if pipelined else None
+        try:
+            next_page = self._request_search_page(executor, page_params, start_page_token, quota_limit)
+            while next_page is not None:
+                data = next_page()  # waits for the prefetch when pipelined
+                next_page = None
+
+                if not data or 'items' not in data or not data['items']:
+                    break
+                self.pages_fetched += 1
+
+                # Get next page token; when pipelined, request that page right away
                 page_token = data.get('nextPageToken')
-                if not page_token:
+                has_next = page_token and self.pages_fetched < max_pages
+                if pipelined and has_next:
+                    # leave room for enriching the current page, which is charged after the prefetch
+                    next_page = self._request_search_page(executor, page_params, page_token, quota_limit,
+                                                          reserve=PAGE_ENRICH_UNITS)
+
+                if not handle_page(data, page_token):
                     break
 
-                pages_fetched += 1
+                if not pipelined and has_next:
+                    next_page = self._request_search_page(None, page_params, page_token, quota_limit)
 
-            except requests.RequestException as e:
-                print(f"Request error during search: {str(e)}")
-                break
-            except Exception as e:
-                print(f"Unexpected error during search: {str(e)}")
-                break
+        except FATAL_ERRORS:
+            raise
+        except YouTubeAPIError as e:
+            print(f"Search API error: {str(e)}")
+            self.search_failed = True
+        except requests.RequestException as e:
+            print(f"Request error during search: {str(e)}")
+            self.search_failed = True
+        except Exception as e:
+            print(f"Unexpected error during search: {str(e)}")
+            self.search_failed = True
+        finally:
+            if executor:
+                executor.shutdown(wait=True)
+
+    def _request_search_page(self, executor, page_params, page_token, quota_limit, reserve=0):
+        """
+        Check quota for one more search.list call (plus <reserve> units still to be spent) and schedule it.
+        Returns a callable yielding the page data, or None when quota does not allow it.
+        A page fresh in search_cache is returned without a request (or None in
+        cache_only mode when it is not cached).
+        With an executor the request starts immediately in the background.
+        """
+        params = page_params(page_token)
+        body, etag, fresh = self._cache_lookup('search', params)
+        if fresh:
+            return lambda: body
+        if self.cache_only:
+            print(f"Page not in the search cache, stopping search")
+            return None
+
+        # Check if we have enough quota for this request
+        if quota_limit and (self.quota_used + 100 + reserve) > quota_limit:
+            print(f"Quota limit would be exceeded, stopping search")
+            self.stopped_by_quota = True
+            return None
+        remaining = self.quota_budget.remaining() if reserve and self.quota_budget is not None else None
+        if remaining is not None and remaining < 100 + reserve:
+            print(f"Quota budget exhausted, stopping search")
+            self.stopped_by_quota = True
+            return None
+        api_key = self._reserve_quota('search', 100)
+        if not api_key:
+            print(f"Quota budget or daily quota exhausted, stopping search")
+            self.stopped_by_quota = True
+            return None
+
+        if executor:
+            return executor.submit(self._fetch, 'search', params, api_key, body, etag).result
+        return lambda: self._fetch('search', params, api_key, body, etag)
 
-        return all_videos
-    
     def _get_video_details(self, video_ids, quota_remaining):
         """Get detailed information for a list of video IDs"""
         if not video_ids or (quota_remaining and quota_remaining < 1):
@@ -121,19 +583,12 @@ class YouTubeSearcher:
             try:
                 params = {
                     'part': 'statistics,contentDetails,snippet',
-                    'id': ','.join(batch_ids),
-                    'key': self.api_key
+                    'id': ','.join(batch_ids)
                 }
                 
-                response = requests.get(f'{self.base_url}/videos', params=params)
-                time.sleep(self.rate_limit_delay)
-                
-                if response.status_code != 200:
-                    print(f"Videos API error: {response.status_code} - {response.text}")
-                    continue
-                
-                data = response.json()
-                self.quota_used += 1  # videos.list costs 1 unit
+                data = self._get_cached('videos', params)
+                if data is None:
+                    break
                 
                 for item in data.get('items', []):
                     video_data = self._parse_video_item(item)
@@ -144,22 +599,39 @@ class YouTubeSearcher:
                 if quota_remaining and self.quota_used >= quota_remaining:
                     break
                     
+            except FATAL_ERRORS:
+                raise
+            except YouTubeAPIError as e:
+                print(f"Videos API error: {str(e)}")
+                self.search_failed = True
+                continue
             except requests.RequestException as e:
                 print(f"Request error getting video details: {str(e)}")
+                self.search_failed = True
                 continue
             except Exception as e:
                 print(f"Unexpected error getting video details: {str(e)}")
+                self.search_failed = True
                 continue
         
         return videos
     
     def _get_channel_details(self, channel_ids, quota_remaining):
-        """Get channel information for subscriber counts"""
-        if not channel_ids or (quota_remaining and quota_remaining < 1):
+        """Get channel information for subscriber counts (cached channels are not re-fetched)"""
+        if not channel_ids:
             return {}
-        
+
         channel_info = {}
-        
+        if self.channel_cache is not None:
+            channel_info, channel_ids = self.channel_cache.lookup(channel_ids)
+            if not channel_ids:
+                return channel_info
+
+        if quota_remaining and quota_remaining < 1:
+            return channel_info
+
+        fetched = {}
+
         # Process in batches of 50
         for i in range(0, len(channel_ids), 50):
             batch_ids = channel_ids[i:i+50]
@@ -167,85 +639,38 @@ class YouTubeSearcher:
             try:
                 params = {
                     'part': 'statistics',
-                    'id': ','.join(batch_ids),
-                    'key': self.api_key
+                    'id': ','.join(batch_ids)
                 }
                 
-                response = requests.get(f'{self.base_url}/channels', params=params)
-                time.sleep(self.rate_limit_delay)
-                
-                if response.status_code != 200:
-                    print(f"Channels API error: {response.status_code} - {response.text}")
-                    continue
-                
-                data = response.json()
-                self.quota_used += 1  # channels.list costs 1 unit
+                data = self._get_cached('channels', params)
+                if data is None:
+                    break
                 
                 for item in data.get('items', []):
-                    channel_id = item['id']
-                    statistics = item.get('statistics', {})
-                    
-                    channel_info[channel_id] = {
-                        'subscriber_count': int(statistics.get('subscriberCount', 0)),
-                        'hidden_subscriber_count': statistics.get('hiddenSubscriberCount', False)
-                    }
+                    channel_id, info = self._parse_channel_item(item)
+                    fetched[channel_id] = info
                 
                 # Check quota
                 if quota_remaining and self.quota_used >= quota_remaining:
                     break
                     
+            except FATAL_ERRORS:
+                raise
+            except YouTubeAPIError as e:
+                print(f"Channels API error: {str(e)}")
+                self.search_failed = True
+                continue
             except requests.RequestException as e:
                 print(f"Request error getting channel details: {str(e)}")
+                self.search_failed = True
                 continue
             except Exception as e:
                 print(f"Unexpected error getting channel details: {str(e)}")
+                self.search_failed = True
                 continue
         
+        if self.channel_cache is not None:
+            self.channel_cache.update(fetched)
+        channel_info.update(fetched)
         return channel_info
-    
-    def _parse_video_item(self, item):
-        """Parse a video item from the API response and return a dict."""
-        try:
-            video_id = item['id']
-            snippet = item['snippet']
-            statistics = item.get('statistics', {})
-            content_details = item.get('contentDetails', {})
-
-            # Parse duration
-            duration_iso = content_details.get('duration', 'PT0S')
-            duration_minutes = parse_duration_minutes(duration_iso)
-
-            # Build the dict
-            video_data = {
-                'video_id': video_id,
-                'video_url': f'https://www.youtube.com/watch?v={video_id}',
-                'title': snippet.get('title', ''),
-                'description': snippet.get('description', ''),
-                'tags': ','.join(snippet.get('tags', [])),
-                'channel_title': snippet.get('channelTitle', ''),
-                'channel_id': snippet.get('channelId', ''),
-                'published_at': snippet.get('publishedAt', ''),
-                'view_count': int(statistics.get('viewCount', 0)),
-                'comments': int(statistics.get('commentCount', 0)),   # NEW
-                'likes': int(statistics.get('likeCount', 0)),
-                'duration': duration_iso,
-                'duration_minutes': duration_minutes,
-                'subscriber_count': 0,
-                'hidden_subscriber_count': False
-            }
-            return video_data
-
-        except Exception as e:
-            print(f"Skipping malformed video item: {e}")
-            return None   # caller ignores None
-    
-    def _get_duration_param(self, duration_filter):
-        """Convert duration filter to API parameter"""
-        if duration_filter == 'Short (<4 min)':
-            return 'short'
-        elif duration_filter == 'Medium (4-20 min)':
-            return 'medium'
-        elif duration_filter == 'Long (>20 min)':
-            return 'long'
-        else:
-            return None  # 'Any' or 'Custom' - no API filter
+    
\ No newline at end of file
@@ -0,0 +1,368 @@
+import asyncio
+import json
+
+try:
+    import aiohttp
+except ImportError:  # optional dependency, only needed for search_engine = 'async'
+    aiohttp = None
+
+from youtube_api import (SearcherHelpers, DEFAULT_TIMEOUT, DEFAULT_MAX_PER_HOST, DEFAULT_BASE_URL,
+                         setting_int, create_channel_cache, create_response_cache,
+                         create_search_cache, PAGE_ENRICH_UNITS)
+from api_errors import (FATAL_ERRORS, QuotaExceededError, RetryPolicy, TransientAPIError, api_error,
+                        error_message, retry_after_seconds)
+from quota_manager import call_outcome
+from rate_limiter import RateLimiter
+
+DEFAULT_MAX_CONCURRENCY = 10  # API requests in flight at once
+
+
+class AsyncYouTubeSearcher(SearcherHelpers):
+    """
+    asyncio variant of youtube_api.YouTubeSearcher built on aiohttp.
+    search_videos has the same contract and returns the same video dicts,
+    but many searches can run on one event loop, with a semaphore capping
+    how many API requests are in flight at once. One instance is shared by
+    all tasks (use search_many), so unlike YouTubeSearcher it has no clone().
+    """
+
+    def __init__(self, api_key, timeout=DEFAULT_TIMEOUT, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 max_per_host=DEFAULT_MAX_PER_HOST, keep_alive=True, quota_budget=None):
+        if aiohttp is None:
+            raise ImportError("The async engine requires aiohttp: pip install aiohttp")
+        self.api_key = api_key
+        self.base_url = DEFAULT_BASE_URL
+        self.quota_used = 0
+        self.rate_limiter = RateLimiter()
+        self.retry_policy = RetryPolicy()
+        self.timeout = timeout
+        self.max_concurrency = max_concurrency
+        self.max_per_host = max_per_host
+        self.keep_alive = keep_alive
+        self.quota_budget = quota_budget
+        self.key_pool = None
+        self.pipelined = False
+        self.channel_cache = None
+        self.response_cache = None
+        self.search_cache = None
+        self.cache_only = False
+        self.seen_filter = None
+        self.seen_skipped = 0
+        self.stopped_by_quota = False
+        self.pages_fetched = 0
+        self.session = None     # aiohttp.ClientSession, created inside the running loop
+        self._semaphore = None
+        self._connection_stats = {'requests': 0, 'connections_opened': 0, 'connections_reused': 0}
+
+    @classmethod
+    def from_settings(cls, api_key, settings):
+        """Create an async searcher using the http_* / async_* options from settings.json"""
+        searcher = cls(api_key,
+                       timeout=setting_int(settings, 'http_timeout', DEFAULT_TIMEOUT),
+                       max_concurrency=setting_int(settings, 'async_max_concurrency', DEFAULT_MAX_CONCURRENCY),
+                       max_per_host=setting_int(settings, 'http_max_per_host', DEFAULT_MAX_PER_HOST),
+                       keep_alive=settings.get('http_keep_alive', True))
+        searcher.base_url = settings.get('api_base_url', '') or DEFAULT_BASE_URL
+        searcher.pipelined = bool(settings.get('pipeline_pages', False))
+        searcher.channel_cache = create_channel_cache(settings)
+        searcher.response_cache = create_response_cache(settings)
+        searcher.search_cache = create_search_cache(settings)
+        searcher.rate_limiter = RateLimiter.from_settings(settings)
+        searcher.retry_policy = RetryPolicy.from_settings(settings)
+        return searcher
+
+    async def __aenter__(self):
+        self._open()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _open(self):
+        if self.session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_concurrency,
+                                             limit_per_host=self.max_per_host,
+                                             force_close=not self.keep_alive)
+            self.session = aiohttp.ClientSession(connector=connector,
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout),
+                                                 trace_configs=[self._trace_config()])
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def close(self):
+        """Close the aiohttp session and persist the channel, response and search caches"""
+        for cache in (self.channel_cache, self.response_cache, self.search_cache):
+            if cache is not None:
+                cache.save()
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _trace_config(self):
+        """Count requests and new vs reused connections, like YouTubeSearcher.get_connection_stats"""
+        stats = self._connection_stats
+
+        async def on_request_start(session, context, params):
+            stats['requests'] += 1
+
+        async def on_connection_create_end(session, context, params):
+            stats['connections_opened'] += 1
+
+        async def on_connection_reuseconn(session, context, params):
+            stats['connections_reused'] += 1
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(on_request_start)
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def get_connection_stats(self):
+        """Return how many HTTP connections were opened vs reused by this searcher"""
+        return dict(self._connection_stats)
+
+    async def _call(self, endpoint, params, cost, counter, label, cached=False):
+        """
+        Issue one API call under the concurrency semaphore.
+        Returns the decoded JSON, or None when quota does not allow the call or it failed.
+        With <cached>, the endpoint's cache is consulted first (as in YouTubeSearcher._get_cached);
+        in cache_only mode no request is made and uncached calls return None.
+        A key taken out of rotation by the key pool is replaced and the call repeated,
+        and transient failures are retried with backoff per retry_policy.
+        Every answered try is counted in counter['quota'], like in the key's ledger;
+        a try lost to a network error has its budget reservation released.
+        QuotaExceededError / KeyInvalidError (or the last error, once no key has quota
+        left for a retry) are raised so the search stops.
+        """
+        cache = self._cache_for(endpoint) if cached else None
+        body, etag, fresh = self._cache_lookup(endpoint, params) if cached else (None, None, False)
+        if fresh:
+            return body
+        if self.cache_only:
+            return None
+        headers = {'If-None-Match': etag} if etag else None
+
+        api_key = self._reserve_quota(endpoint, cost)
+        if api_key is None:
+            counter['stopped'] = 'quota'   # the budget or every key is out of quota
+            return None
+        attempt = 0
+        while True:
+            attempt += 1
+            self._open()
+            retry_after = None
+            try:
+                async with self._semaphore:
+                    await self.rate_limiter.acquire_async(cost)
+                    async with self.session.get(f'{self.base_url}/{endpoint}',
+                                                params=dict(params, key=api_key),
+                                                headers=headers) as response:
+                        if response.status == 304:
+                            self._record_call(api_key, endpoint, 'not_modified')
+                            counter['quota'] += cost
+                            cache.not_modified(endpoint, params)
+                            return body
+                        if response.status == 200:
+                            data = await response.json(content_type=None)
+                            self._record_call(api_key, endpoint, 'ok')
+                            counter['quota'] += cost
+                            if cache is not None:
+                                cache.store(endpoint, params, data, response.headers.get('ETag'))
+                            return data
+                        text = await response.text()
+                        retry_after = retry_after_seconds(response.headers)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self._record_call(api_key, endpoint, 'network_error')
+                self._release_quota(cost)
+                error, outcome = TransientAPIError(0, 'network_error', str(e) or 'timeout'), 'network_error'
+            else:
+                counter['quota'] += cost  # error responses are charged too, as in the ledger
+                try:
+                    data = json.loads(text)
+                except ValueError:
+                    data = None
+                outcome = call_outcome(response.status, data)
+                error = api_error(response.status, outcome, error_message(data) or text[:200])
+                if self._record_call(api_key, endpoint, outcome):
+                    api_key = self._retry_key(endpoint, error)
+                    continue
+
+            if isinstance(error, FATAL_ERRORS):
+                if isinstance(error, QuotaExceededError):
+                    self.stopped_by_quota = True
+                raise error
+            delay = self.retry_policy.next_delay(attempt, retry_after) if error.transient else None
+            if delay is None:
+                print(f"{label} API error: {str(error)}")
+                counter['stopped'] = 'error'
+                return None
+            print(f"{endpoint}.list failed ({outcome}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            api_key = self._retry_key(endpoint, error)
+
+    async def search_videos(self, query, max_pages=2, region='', language='',
+                            duration_filter='Any', quota_limit=10000,
+                            published_after='', published_before='', on_page=None):
+        """
+        Search for videos using the YouTube API (async)
+        Returns list of video dictionaries with complete metadata
+        on_page(page_videos, next_page_token) is called after every page; returning False stops the search
+        """
+        counter = {'quota': 0, 'seen': 0, 'pages': 0}
+        page_handler = None
+        if on_page is not None:
+            page_handler = lambda videos, seen_skipped, token: on_page(videos, token)
+        videos = await self._search(query, max_pages, region, language, duration_filter,
+                                    quota_limit, published_after, published_before, counter, page_handler)
+        self.quota_used = counter['quota']
+        self.seen_skipped = counter['seen']
+        self.pages_fetched = counter['pages']
+        if isinstance(counter.get('error'), FATAL_ERRORS):
+            raise counter['error']
+        return videos
+
+    async def search_many(self, queries, on_page=None, **search_params):
+        """
+        Run search_videos for many queries concurrently.
+        Returns a list of (videos, counter) tuples in the same order as <queries>,
+        where counter holds the 'quota' spent, the 'seen' videos skipped and the 'pages' fetched
+        for that query, and 'stopped' when it did not finish normally: 'quota' when quota ran
+        out, 'error' when a call failed (the exception is in 'error'). Such a query must not be
+        checkpointed as completed; the videos of the pages it did fetch are still returned.
+        on_page(query, page_videos, seen_skipped, next_page_token) is called after every page
+        with the videos enriched and the already-seen ones skipped on that page; returning False
+        stops that query.
+        """
+        async def run(query):
+            counter = {'quota': 0, 'seen': 0, 'pages': 0}
+            page_handler = None
+            if on_page is not None:
+                page_handler = lambda videos, seen_skipped, token: on_page(query, videos, seen_skipped, token)
+            videos = await self._search(query, counter=counter, on_page=page_handler, **search_params)
+            return videos, counter
+
+        results = await asyncio.gather(*(run(query) for query in queries))
+        self.quota_used = sum(counter['quota'] for _, counter in results)
+        self.seen_skipped = sum(counter['seen'] for _, counter in results)
+        return results
+
+    async def _search(self, query, max_pages=2, region='', language='', duration_filter='Any',
+                      quota_limit=10000, published_after='', published_before='', counter=None,
+                      on_page=None):
+        """
+        Page through one query, enriching each page. A failed call ends the search with
+        counter['stopped'] = 'error' (the exception in counter['error']) and returns the
+        videos of the pages fetched so far.
+        """
+        all_videos = []
+        pages_fetched = 0
+        duration_param = self._get_duration_param(duration_filter)
+
+        def request_page(page_token, reserve=0):
+            """
+            Start one search.list call as a task, or return None when quota does not allow it
+            (with <reserve> units still to be spent on the current page)
+            """
+            if quota_limit and (counter['quota'] + 100 + reserve) > quota_limit:
+                print(f"Quota limit would be exceeded, stopping search")
+                counter['stopped'] = 'quota'
+                return None
+            params = self._build_search_params(query, page_token, region, language,
+                                               duration_param, published_after, published_before)
+            return asyncio.ensure_future(self._call('search', params, 100, counter, 'Search', cached=True))
+
+        next_page = request_page(None)
+        try:
+            while next_page is not None:
+                data = await next_page
+                next_page = None
+                if not data or not data.get('items'):
+                    break
+                pages_fetched += 1
+                counter['pages'] += 1
+
+                # When pipelined, the next page is in flight while this one is enriched
+                page_token = data.get('nextPageToken')
+                has_next = page_token and pages_fetched < max_pages
+                if self.pipelined and has_next:
+                    # leave room for enriching this page, which is charged after the prefetch
+                    next_page = request_page(page_token, reserve=PAGE_ENRICH_UNITS)
+
+                # Already-seen videos are dropped before enrichment
+                video_ids = [item['id']['videoId'] for item in data['items']]
+                seen_skipped = 0
+                if self.seen_filter is not None:
+                    unseen = [video_id for video_id in video_ids if not self.seen_filter(video_id)]
+                    seen_skipped = len(video_ids) - len(unseen)
+                    counter['seen'] += seen_skipped
+                    video_ids = unseen
+
+                video_details = []
+                if video_ids:
+                    video_details = await self._get_video_details(video_ids, counter)
+                    if not video_details:
+                        break
+
+                    channel_ids = list(set([video['channel_id'] for video in video_details]))
+                    channel_info = await self._get_channel_details(channel_ids, counter)
+
+                    for video in video_details:
+                        video.update(channel_info.get(video['channel_id'], {}))
+                    all_videos.extend(video_details)
+
+                if on_page is not None and on_page(video_details, seen_skipped, page_token) is False:
+                    break
+
+                if not self.pipelined and has_next:
+                    next_page = request_page(page_token)
+        except Exception as e:
+            print(f"  ERROR searching '{query}': {str(e)}")
+            counter['stopped'] = 'error'
+            counter['error'] = e
+        finally:
+            if next_page is not None:
+                try:
+                    await next_page  # a prefetched page we no longer need still counts against quota
+                except Exception:
+                    pass
+
+        return all_videos
+
+    async def _get_video_details(self, video_ids, counter):
+        """Get detailed information for a list of video IDs (batches run concurrently)"""
+        batches = [video_ids[i:i+50] for i in range(0, len(video_ids), 50)]
+        responses = await asyncio.gather(*(
+            self._call('videos', {'part': 'statistics,contentDetails,snippet',
+                                  'id': ','.join(batch)},
+                       1, counter, 'Videos', cached=True)
+            for batch in batches))
+
+        videos = []
+        for data in responses:
+            for item in (data or {}).get('items', []):
+                video_data = self._parse_video_item(item)
+                if video_data:
+                    videos.append(video_data)
+        return videos
+
+    async def _get_channel_details(self, channel_ids, counter):
+        """Get channel information for subscriber counts (batches run concurrently, cached channels skipped)"""
+        cached = {}
+        if self.channel_cache is not None:
+            cached, channel_ids = self.channel_cache.lookup(channel_ids)
+
+        batches = [channel_ids[i:i+50] for i in range(0, len(channel_ids), 50)]
+        responses = await asyncio.gather(*(
+            self._call('channels', {'part': 'statistics', 'id': ','.join(batch)},
+                       1, counter, 'Channels', cached=True)
+            for batch in batches))
+
+        channel_info = {}
+        for data in responses:
+            for item in (data or {}).get('items', []):
+                channel_id, info = self._parse_channel_item(item)
+                channel_info[channel_id] = info
+
+        if self.channel_cache is not None:
+            self.channel_cache.update(channel_info)
+        channel_info.update(cached)
+        return channel_info